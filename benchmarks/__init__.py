@@ -0,0 +1,5 @@
+"""
+Benchmarks for Flux Envelope Analysis on generated polytopes
+
+Run with ``python -m benchmarks.run`` from the repository root. See :mod:`benchmarks.run` for the options
+"""
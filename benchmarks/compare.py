@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Compare two result files from :mod:`benchmarks.run`
+
+Example
+-------
+    python -m benchmarks.compare before.jsonl after.jsonl
+
+Cases are matched on model, dims, cons, projected, seed and options. For each measurement the geometric mean of after/before over all matched cases is printed, followed by any cases whose lattice size changed
+"""
+import sys
+import json
+import argparse
+import numpy as np
+
+_keys=('model','dims','cons','projected','seed')
+_measurements=('wall_time','lp_solves','lp_time','lstsq_calls','lstsq_time','peak_memory','nodes','edges')
+
+def load(path):
+    """Read a result file into a dictionary keyed by case. Later lines for the same case replace earlier ones"""
+    res={}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                r=json.loads(line)
+                res[tuple(r.get(k) for k in _keys)+(json.dumps(r.get('options'),sort_keys=True),)]=r
+    return res
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(prog='python -m benchmarks.compare',description=__doc__.strip().split('\n')[0])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args=parser.parse_args(argv)
+
+    before,after=load(args.before),load(args.after)
+    matched=sorted(set(before)&set(after),key=str)
+    print(str(len(matched))+' matched cases')
+    if not matched:
+        return
+
+    for m in _measurements:
+        ratios=[after[k][m]/before[k][m] for k in matched if before[k].get(m) and after[k].get(m) is not None]
+        if ratios:
+            print('{:<12} {:8.3f}x'.format(m,float(np.exp(np.mean(np.log(np.maximum(ratios,10**-12)))))))
+
+    for k in matched:
+        if before[k]['f_vector']!=after[k]['f_vector']:
+            print('f_vector changed for '+str(k[:-1])+': '+str(before[k]['f_vector'])+' -> '+str(after[k]['f_vector']))
+
+if __name__=='__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Models for the benchmarks: the random polytope from test_ReducedSolutionsMatch and the pyramid from the examples
+"""
+import numpy as np
+from optlang import Model, Variable, Constraint
+
+
+def random_polytope(dims,cons=None,limit=10,seed=None):
+    """Build a random polytope
+
+    Each constraint has a random positive unit normal and a random bound, inside a box of -limit<=variable<=limit
+
+    Parameters
+    ----------
+    dims : int
+        Number of variables
+    cons : int
+        Number of random constraints. Default 2*dims
+    limit : float
+        Bound on every variable. Default 10
+    seed : int
+        Seed for the random numbers, so the same arguments always give the same model
+
+    Returns
+    -------
+    model, variables : tuple
+        The :class:`optlang.Model` and its variables in order
+    """
+    if cons is None:
+        cons=2*dims
+    rs=np.random.RandomState(seed)
+    model=Model(name='Random')
+
+    variables=[Variable('v'+str(i),ub=limit,lb=-limit) for i in range(dims)]
+    model.add(variables)
+
+    for i in range(cons):
+        val=rs.rand(dims)
+        val=val/np.linalg.norm(val)
+        cns=(rs.random_sample()-.5)*2*limit
+        if cns>0:
+            model.add(Constraint(np.dot(variables,val),ub=cns,name='C'+str(i)))
+        else:
+            model.add(Constraint(np.dot(variables,val),lb=cns,name='C'+str(i)))
+    return model,variables
+
+def pyramid():
+    """The pyramid from the examples
+
+    Returns
+    -------
+    model, variables : tuple
+        The :class:`optlang.Model` and its variables x, y, z
+    """
+    model=Model(name='Pyramid')
+    x,y,z=(Variable('x'),Variable('y'),Variable('z'))
+    model.add([x,y,z])
+    model.add(Constraint(y,lb=0,name='base'))
+    model.add(Constraint(-x+y,ub=1,name='left_wall'))
+    model.add(Constraint(x+y,ub=1,name='right_wall'))
+    model.add(Constraint(-z+y,ub=1,name='front_wall'))
+    model.add(Constraint(z+y,ub=1,name='back_wall'))
+    return model,[x,y,z]
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Run Flux Envelope Analysis over a grid of random polytopes and write one JSON line per case
+
+Example
+-------
+    python -m benchmarks.run --dims 4 6 --cons 2 3 --projected 2 3 --seeds 3 --output results.jsonl
+
+Each line holds the case (dims, cons, projected, seed and options), the commit it ran on, the wall time, the number of LP solves and lstsq calls, the peak traced memory and the lattice size.
+Compare two result files with ``python -m benchmarks.compare``
+"""
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import warnings
+
+from fea import flux_envelope_analysis
+from .models import random_polytope, pyramid
+
+
+def commit():
+    """The current git commit of the repository, or None outside a git checkout"""
+    try:
+        return subprocess.check_output(['git','rev-parse','--short','HEAD'],stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError,subprocess.CalledProcessError):
+        return None
+
+def run_case(model,variables,memory=True,**kwargs):
+    """Solve one case and measure it
+
+    Parameters
+    ----------
+    model : :class:`optlang.Model`
+        The model to reduce
+    variables : iterable
+        The variables to reduce to
+    memory : bool
+        Whether to trace the peak memory. Tracing slows the solve down, but equally for every commit. Default True
+    kwargs
+        Passed on to :func:`fea.flux_envelope_analysis`
+
+    Returns
+    -------
+    A dictionary of measurements
+    """
+    if memory:
+        tracemalloc.start()
+    try:
+        start=time.perf_counter()
+        reduced=flux_envelope_analysis(model,variables,**kwargs)
+        wall=time.perf_counter()-start
+        peak=tracemalloc.get_traced_memory()[1] if memory else None
+    finally:
+        if memory:
+            tracemalloc.stop()
+
+    return {
+        'wall_time':wall,
+        'lp_solves':reduced.stats['lp'],
+        'lstsq_calls':reduced.stats['lstsq'],
+        'lp_time':reduced.stats.times.get('lp',0.0),
+        'lstsq_time':reduced.stats.times.get('lstsq',0.0),
+        'peak_memory':peak,
+        'iterations':reduced._iterations,
+        'complete':bool(reduced.complete),
+        'nodes':reduced.number_of_nodes(),
+        'edges':reduced.number_of_edges(),
+        'f_vector':[int(f) for f in reduced.f_vector],
+    }
+
+def cases(args):
+    """All (name, model builder, case description) combinations for the command line arguments"""
+    if args.pyramid:
+        yield {'model':'pyramid','dims':3,'cons':5,'projected':2,'seed':None},lambda: pyramid()
+        yield {'model':'pyramid','dims':3,'cons':5,'projected':3,'seed':None},lambda: pyramid()
+    for dims in args.dims:
+        for factor in args.cons:
+            for projected in args.projected:
+                if projected>dims:
+                    continue
+                for seed in range(args.seeds):
+                    case={'model':'random','dims':dims,'cons':factor*dims,'projected':projected,'seed':seed}
+                    yield case,lambda case=case: random_polytope(case['dims'],case['cons'],seed=case['seed'])
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(prog='python -m benchmarks.run',description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--dims',type=int,nargs='+',default=[4,6],help='Original dimensions. Default 4 6')
+    parser.add_argument('--cons',type=int,nargs='+',default=[2],help='Constraints per original dimension. Default 2')
+    parser.add_argument('--projected',type=int,nargs='+',default=[2,3],help='Projected dimensions. Default 2 3')
+    parser.add_argument('--seeds',type=int,default=3,help='Random models per combination. Default 3')
+    parser.add_argument('--pyramid',action='store_true',help='Also run the pyramid from the examples')
+    parser.add_argument('--max-iter',type=int,default=1000,help='Maximum searches per case. Default 1000')
+    parser.add_argument('--eps',type=float,default=10**-4,help='Detection limit. Default 1E-4')
+    parser.add_argument('--backend',default='optlang',help="Searcher backend, 'optlang' or 'scipy'. Default optlang")
+    parser.add_argument('--bitset',action='store_true',help='Keep nodes as bitmasks')
+    parser.add_argument('--persistent',action='store_true',help='Use persistent searchers')
+    parser.add_argument('--no-memory',dest='memory',action='store_false',help="Don't trace the peak memory")
+    parser.add_argument('--output',help='File to append the JSON lines to. Default stdout')
+    args=parser.parse_args(argv)
+
+    warnings.simplefilter('ignore')
+    options={'max_iter':args.max_iter,'eps':args.eps,'backend':args.backend,'bitset':args.bitset,'persistent':args.persistent}
+    common={'commit':commit(),'python':platform.python_version(),'options':options}
+
+    out=open(args.output,'a') if args.output else sys.stdout
+    try:
+        for case,build in cases(args):
+            model,variables=build()
+            res=dict(common,**case)
+            res.update(run_case(model,variables[:case['projected']],memory=args.memory,**options))
+            out.write(json.dumps(res,sort_keys=True)+'\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__=='__main__':
+    main()
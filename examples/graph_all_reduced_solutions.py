@@ -18,7 +18,7 @@ import subprocess
 import numpy as np
 from optlang import *
 from itertools import combinations, chain
-from fea import flux_envelope_analysis as fea
+from fea import flux_envelope_analysis_many
 from fea.plot import generate_graphviz
 
 #### EXAMPLE PARAMETERS ####
@@ -48,15 +48,15 @@ for i in range(original_cons):
       model.add(Constraint(np.dot(original_vars,val),lb=cns,name='C'+str(i)))
 
 #### SOLVE AND GRAPH ####
-# Use all possible 2d and 3d combos
-for combo in chain(combinations(original_vars, 2),combinations(original_vars, 3)):
-  # Solve FEA model (if using GLPK, expect the 3d ones to be very noisy)
-  reduced = fea(model, combo)
+# The batch is solved in worker processes, which import this script again where they are spawned (macOS and Windows)
+if __name__ == '__main__':
+  # Use all possible 2d and 3d combos, solved side by side (if using GLPK, expect the 3d ones to be very noisy)
+  for combo, reduced in flux_envelope_analysis_many(model, chain(combinations(original_vars, 2),combinations(original_vars, 3))):
 
-  # Get graphviz format
-  reduced_graph = generate_graphviz(reduced)
+    # Get graphviz format
+    reduced_graph = generate_graphviz(reduced)
 
-  # Generate the image from the input
-  proc = subprocess.Popen(["dot","-Tpng","-o",'./graph_all_reduced_solutions/'+''.join([v.name for v in combo])+'.png'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-  output = proc.communicate(input=reduced_graph.encode())[0]
+    # Generate the image from the input
+    proc = subprocess.Popen(["dot","-Tpng","-o",'./graph_all_reduced_solutions/'+''.join([v.name for v in combo])+'.png'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    output = proc.communicate(input=reduced_graph.encode())[0]
 
@@ -19,7 +19,7 @@ import matplotlib
 from optlang import *
 from itertools import combinations, chain
 
-from fea import flux_envelope_analysis as fea
+from fea import flux_envelope_analysis_many
 from fea.plot import plot
 
 #### EXAMPLE PARAMETERS ####
@@ -78,21 +78,21 @@ def stepwise_check(model,variables):
     return retval
 
 #### SOLVE AND PLOT ####
-# Use all possible 2d and 3d combos
-for combo in chain(combinations(original_vars, 2),combinations(original_vars, 3)):
-  # Solve FEA model (if using GLPK, expect the 3d ones to be very noisy)
-  reduced = fea(model, combo)
+# The batch is solved in worker processes, which import this script again where they are spawned (macOS and Windows)
+if __name__ == '__main__':
+  # Use all possible 2d and 3d combos, solved side by side (if using GLPK, expect the 3d ones to be very noisy)
+  for combo, reduced in flux_envelope_analysis_many(model, chain(combinations(original_vars, 2),combinations(original_vars, 3))):
 
-  # Solve stepwise (for comparison)
-  stepwise = stepwise_check(model, combo)
+    # Solve stepwise (for comparison)
+    stepwise = stepwise_check(model, combo)
 
-  # Plot the reduced solution
-  currfigure, currplot = plot(reduced, x=combo[0].name, y=combo[1].name)
+    # Plot the reduced solution
+    currfigure, currplot = plot(reduced, x=combo[0].name, y=combo[1].name)
 
-  # Add the stepwise stuff
-  for step in stepwise:
-    currplot.plot(*np.transpose(step),"X:",markersize=5, linewidth=1, color="gray")
+    # Add the stepwise stuff
+    for step in stepwise:
+      currplot.plot(*np.transpose(step),"X:",markersize=5, linewidth=1, color="gray")
 
-  # Save the figure
-  currfigure.savefig("./plot_all_reduced_combinations/"+''.join([v.name for v in combo])+".svg")
+    # Save the figure
+    currfigure.savefig("./plot_all_reduced_combinations/"+''.join([v.name for v in combo])+".svg")
 
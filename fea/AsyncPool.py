@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+import logging
+log=logging.getLogger('fea.async')
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .LatticeGraph import LatticeGraph
+from .VWrapper import VWrapper
+
+def _run_job(problem,variables,cancel,graph_args,solve_args):
+    """Private. Solve one job in a worker process, stopping between searches once cancel is set
+
+    The model arrives pickled, so it already is a copy and does not need to be cloned again
+    """
+    obj=LatticeGraph(problem,variables,clone=False,**graph_args)
+    try:
+        obj.solve(stop=cancel.is_set,**solve_args)
+    finally:
+        obj.close()
+    return obj
+
+class AsyncPool:
+    def __init__(self,workers=None):
+        """
+        Run Flux Envelope Analysis jobs from asyncio, each solved in a worker process
+
+        At most workers jobs solve at once and the others wait for a free worker, so one event loop can keep many jobs in flight.
+        Cancelling the task awaiting a job takes it out of the queue, or stops its solve before the next search
+
+        Parameters
+        ----------
+        workers : int
+            Number of worker processes. Defaults to the number of CPUs
+        """
+        if workers is None:
+            workers=multiprocessing.cpu_count()
+        self.workers=workers
+
+        log.info('Starting '+str(workers)+' workers')
+        self._executor=ProcessPoolExecutor(workers)
+        # Serves the cancel flags, which have to reach jobs already running in a worker
+        self._manager=multiprocessing.Manager()
+
+    async def solve(self,model,variables,max_value=1000,max_iter=1000,eps=10**-4,bitset=False,persistent=False,backend='optlang',prior=None,time_budget=None,lp_budget=None,lp_timeout=None,presolve=False,nullspace=False):
+        """
+        Run Flux Envelope Analysis on a model for the given variables without blocking the event loop
+
+        Parameters
+        ----------
+        model, variables, max_value, max_iter, eps, bitset, persistent, backend, prior, time_budget, lp_budget, lp_timeout, presolve, nullspace:
+            As for :func:`fea.flux_envelope_analysis`. The time budget starts once a worker picks the job up
+
+        Returns
+        -------
+        The :class:`fea.LatticeGraph` solution
+
+        Raises
+        ------
+        asyncio.CancelledError
+            If the awaiting task is cancelled. A job which already started stops before its next search and its partial solution is dropped
+        """
+        # Only ship the OptLang model and the variables (never a whole Cameo/CobraPy model) to the workers
+        problem=getattr(model,'solver',model)
+        variables=[VWrapper(v,problem) for v in variables]
+        graph_args=dict(max_value=max_value,eps=eps,bitset=bitset,persistent=persistent,backend=backend,prior=prior,presolve=presolve,nullspace=nullspace)
+        solve_args=dict(max_iter=max_iter,time_budget=time_budget,lp_budget=lp_budget,lp_timeout=lp_timeout)
+
+        cancel=self._manager.Event()
+        future=asyncio.get_running_loop().run_in_executor(self._executor,_run_job,problem,variables,cancel,graph_args,solve_args)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+    def close(self):
+        """Shut down the worker processes once the jobs already submitted are done
+
+        This blocks until they are, so from a running event loop await :func:`aclose` instead
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor=None
+            self._manager.shutdown()
+
+    async def aclose(self):
+        """Shut down the worker processes as :func:`close` does, waiting in a thread so the event loop keeps running"""
+        await asyncio.get_running_loop().run_in_executor(None,self.close)
+
+    def __len__(self):
+        """Length is the number of worker processes"""
+        return self.workers
@@ -4,22 +4,21 @@ log=logging.getLogger('fea.halfspace')
 
 import numpy as np
 import itertools
+from .util import coefficients
 
 class Halfspace:
     _id_gen = iter(itertools.count())
     
     # Class for Facet Constraint Storage/Calculation
-    def __init__(self,variables,norm,point,real=True,eps=10**-6,interface=None,required=set()):
+    def __init__(self,norm,point,real=True,eps=10**-6,required=set()):
         """
         Class for a facet/halfspace constraint in the LatticeGraph as defined in :class:`fea.LatticeGraph`
         Combinations of Halfspace objects define a :class:`fea.Node`
 
-        They are constructed of a series of variables, a normal unit vector, and a point
+        They are constructed of a normal unit vector and a point. Only these numbers are kept; the searcher builds a solver row when it needs one
 
         Parameters
         ----------
-        variables: array of :class:`optlang.Variable`
-            The variables this halfspace is defined over
         norm:   :class:`numpy.ndarray`
             Array indicating the normal vector for this halfspace
         point:  :class:`numpy.ndarray`
@@ -28,8 +27,6 @@ class Halfspace:
             Whether or not this is a real or psuedo-halfspace (one created by the solver for processing)
         eps:    float
             The detection limit/margin of error for the solver
-        interface:
-            Optlang interface to use. It'll steal it from the variables if not defined
         required: array of :class:`fea.Halfspace`
             Halfspaces which are required for this one to be utilized. Only necessary when real=False
         """
@@ -44,11 +41,6 @@ class Halfspace:
         self.norm=norm
         self.point=point
 
-        if interface is None:
-            interface=variables[0].problem
-
-        self.cons=interface.Constraint(np.dot(self.norm,variables), lb=self.rhs+eps, ub=self.rhs+eps, name=self.name)
-
     def distance(self,point):
         """
         Calculate the distance between this halfspace and a point
@@ -85,46 +77,53 @@ class Halfspace:
         # return self.contains(other)
 
     # OptLang Constraint Helper Functions
-    def _ol_cons(self,model):
-        """Private. Get OptLang Constraint for this halfspace"""
-        return model.constraints[self.name]
-    def _ol_dual(self,model):
-        """Private. Get OptLang dual for this halfspace"""
-        return self._ol_cons(model).dual
-    def _ol_rhs(self,model):
-        """Private. Get OptLang upper bound for this halfspace"""
-        return self._ol_cons(model).ub
-    def _ol_eps(self,model):
-        """Private. Get OptLang eps value for this halfspace"""
-        return self._ol_rhs(model)-self.rhs
-    def _ol_new_constraint(self,model,eps=None):
-        """Private. Generate OptLang Constraint for this halfspace"""
-        # Cloning is MUCH faster than creating the constraint anew (expression interpretation is the time limiting step!)
-        cnew=self.cons.clone(self.cons, model=model)
-        if eps is not None:
-            cnew.lb=eps+self.rhs
-            cnew.ub=eps+self.rhs
-        return cnew
+    def _ol_new_constraint(self,model,variables,eps=None):
+        """Private. Add an OptLang Constraint for this halfspace to a model (see :func:`_ol_new_constraints` for several at once)
+
+        Parameters
+        ----------
+        model: :class:`optlang.Model`
+            The model to add the constraint to
+        variables: iterable of :class:`fea.VWrapper`
+            The target variables in that model
+        eps: float
+            Offset of the right-hand side. Defaults to an unbounded row
+        """
+        return _ol_new_constraints([self],model,variables,eps=eps)[0]
 
 # Helpers and Magic Methods
+    def _reset_key(self):
+        """Private. Forget the cached key, hash and name. Called whenever norm, point or eps change"""
+        self._key=None
+        self._hash=None
+        self._name=None
+
     @property
     def key(self):
         """A string representation of this hashtable. Guaranteed to match for identical halfspaces (within our detection limit, eps)"""
         # This is the self contained hashable format for the halfspace. Everything is represented here. Hash and equal will require this
-        return tuple([self.real]+list(np.round(np.append(self.norm,self.rhs), self.dec)))
+        if self._key is None:
+            self._key=tuple([self.real]+list(np.round(np.append(self.norm,self.rhs), self.dec)))
+        return self._key
 
     def __hash__(self):
         """Use the key to generate a hash"""
-        return self.key.__hash__()
+        if self._hash is None:
+            self._hash=self.key.__hash__()
+        return self._hash
 
     @property
     def name(self):
         """Use this as a distinct name"""
         # Originally used hash, had collisions
-        return str(self.key).replace(' ','')
+        if self._name is None:
+            self._name=str(self.key).replace(' ','')
+        return self._name
 
     def __eq__(self,other):
         """Check whether this halfspace and another are identical"""
+        if self is other:
+            return True
         try:
             return self.key == other.key
         except AttributeError:
@@ -155,6 +154,7 @@ class Halfspace:
         """Set the defining point of the halfspace. Re-adjusts RHS when setting"""
         self._point=value
         self._rhs=np.dot(self.norm,self._point)
+        self._reset_key()
 
     @property
     def norm(self):
@@ -164,6 +164,9 @@ class Halfspace:
     def norm(self,value):
         """Set the normal unit vector by normalizing any given vector"""
         self._norm=np.array(value)/np.linalg.norm(value)
+        # Drop round-off noise. Some solvers (GLPK!) return wrong optima for rows with ~1E-16 coefficients
+        self._norm[np.abs(self._norm)<10**-12]=0
+        self._reset_key()
 
     @property
     def eps(self):
@@ -174,6 +177,7 @@ class Halfspace:
         """Set the detection/error limit"""
         self._eps=min(value,1)
         self._dec=int(max(0,-np.log10(self._eps)))
+        self._reset_key()
 
     @property
     def dec(self):
@@ -184,5 +188,32 @@ class Halfspace:
         """Set the detection/error limit power"""
         self._dec=max(0,int(value))
         self._eps=10**(-self._dec)
-
-# TODO: Optimize Static Functions (e.g. key) to not require calculation every time
\ No newline at end of file
+        self._reset_key()
+
+def _ol_new_constraints(halfspaces,model,variables,eps=None):
+    """Private. Add OptLang Constraints for several halfspaces to a model
+
+    The rows are added and the model updated once for all of them, then filled straight from the coefficients (expression interpretation is the time limiting step!)
+
+    Parameters
+    ----------
+    halfspaces: iterable of :class:`fea.Halfspace`
+        The halfspaces to add rows for
+    model: :class:`optlang.Model`
+        The model to add the constraints to
+    variables: iterable of :class:`fea.VWrapper`
+        The target variables in that model
+    eps: float
+        Offset of the right-hand sides. Defaults to unbounded rows
+
+    Returns
+    -------
+    list of :class:`optlang.Constraint` in the order of halfspaces
+    """
+    halfspaces=list(halfspaces)
+    rows=[model.interface.Constraint(0,lb=None if eps is None else eps+h.rhs,ub=None if eps is None else eps+h.rhs,name=h.name) for h in halfspaces]
+    model.add(rows)
+    model.update()
+    for h,c in zip(halfspaces,rows):
+        c.set_linear_coefficients(coefficients(h.norm,variables))
+    return rows
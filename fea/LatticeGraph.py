@@ -2,23 +2,48 @@
 import logging
 log=logging.getLogger('fea.graph')
 
+import sys
+import time
+import pickle
 import numpy as np
 import pandas as pd
 
 from networkx import DiGraph, NetworkXError
 
+from collections import namedtuple
 from itertools import combinations, count, chain, accumulate
 from functools import reduce
+from operator import attrgetter
 from sortedcontainers import SortedListWithKey
 
-from .util import lstsq
-from .Node import Node
+from .util import lstsq, RowMatrix
+from .presolve import presolve as _presolve
+from .nullspace import reparametrize as _reparametrize
+from .Node import Node, HalfspaceRegistry
+from .Halfspace import Halfspace, _ol_new_constraints
 from .Search import Search
+from .ScipySearch import ScipySearch
+from .SearchPool import SearchPool
+from .Stats import Stats
 from .VWrapper import VWrapper
 
+SolveEvent=namedtuple('SolveEvent',['kind','node','halfspace'])
+SolveEvent.__doc__="""An event yielded by :func:`fea.LatticeGraph.iter_solve`
+
+kind is one of:
+
+* 'facet': a real facet node was added, with its halfspace
+* 'vertex': a real vertex node was added
+* 'complete': a node became part of a complete subgraph
+* 'pseudo': a search from node only found a pseudo halfspace
+* 'removed': a real facet or vertex node was removed again (e.g. when a facet turned out to be stale)
+"""
+
 
 class LatticeGraph(DiGraph):
-    def __init__(self,problem,variables,max_value=1000,eps=10**-6):
+    _backends={'optlang':Search,'scipy':ScipySearch}
+
+    def __init__(self,problem,variables,max_value=1000,eps=10**-6,processes=1,clone=True,bitset=False,persistent=False,backend='optlang',prior=None,sink=None,presolve=False,nullspace=False,searcher=None):
         """A directed graph containing the Face Lattice Graph for the reduced space solution
         
         Inherits from :class:`networkx.DiGraph`
@@ -32,24 +57,56 @@ class LatticeGraph(DiGraph):
             Maximum/Minimum Value for each variable (-max_value<=variable<=max_value). Will be applied to all variables with bounds greater than limit. Default 1000.
         eps : float
             Detection limit. Default 1E-4
+        processes : int
+            Number of searcher processes. Values above 1 start a :class:`fea.SearchPool` and search several nodes at once. Default 1
+        clone : bool
+            Whether to clone the problem or solve on the given one. Without a clone the problem's variable bounds and objective are changed in place. Either way the local searcher solves on the graph's problem rather than a copy of its own. Default True
+        bitset : bool
+            Whether to number halfspaces in a :class:`fea.HalfspaceRegistry` and keep every node as an integer bitmask as well. Default False
+        persistent : bool
+            Whether searchers keep one constraint row per halfspace between searches so the solver can warm-start, removing unused rows once too many pile up (see :class:`fea.Search`). Default False
+        backend : str
+            Which searcher solves the LPs: 'optlang' (:class:`fea.Search`) or 'scipy' (:class:`fea.ScipySearch`, HiGHS through scipy.optimize.linprog). Default 'optlang'
+        prior : :class:`fea.LatticeGraph`
+            A previous solution for the same variables (e.g. before a bound change) to warm-start from. Its facets which still hold for this problem are verified and seeded into the graph, with the vertices between them. Default None
+        sink : :class:`fea.TraceSink`
+            Where to record trace events (nodes, edges, searches, LP solves). Can also be set later as the sink attribute. Default None, which records nothing
+        presolve : bool
+            Whether to shrink the problem first by removing fixed variables and empty, redundant or parallel constraints (see :func:`fea.presolve`). The projection onto the variables is unchanged but every LP gets smaller. Without a clone the given problem is reduced. Default False
+        nullspace : bool
+            Whether to rewrite the problem over the null space of its equality rows (see :func:`fea.reparametrize`), after any presolve. The searchers then solve LPs without equality rows over fewer variables. Default False
+        searcher : :class:`fea.Search`
+            A local searcher to take over instead of creating one, e.g. from the graph of the step before in :func:`fea.sweep`. It must already solve on the problem, so clone must be False.
+            Only the optlang backend reads bound changes straight from the model, and the searcher keeps its own persistent setting. Default None
         """
         self.EPS=eps
+        self._max_value=max_value
+        self._bitset=bitset
+        self._persistent=persistent
+        if backend not in self._backends:
+            raise ValueError('Unknown backend '+repr(backend)+'. Choose one of '+', '.join(sorted(self._backends)))
+        self._searcher_class=self._backends[backend]
         self._n=len(variables)
 
         # Minimum f-vector from n-simplex
         self._minimum_f_vector=np.fromiter(accumulate(range(1,self.N+3), func=lambda p,k: p*(self.N+2-k+1)/(k-1)),dtype=np.int)
 
         # Get the problem (should work for OptLang, Cameo, and CobraPy>=0.6.0)
-        try:
-            # This approach should work for Cameo and the latest CobraPy
-            self._problem=problem.solver.interface.Model.clone(problem.solver)
-        except AttributeError:
+        self._model_pickle=None
+        if not clone:
+            # Cameo and CobraPy keep the OptLang model as their solver
+            self._problem=getattr(problem,'solver',problem)
+        else:
             try:
-                # This should work for older OptLang model
-                self._problem=problem.interface.Model.clone(problem)
+                # This approach should work for Cameo and the latest CobraPy
+                self._problem=problem.solver.interface.Model.clone(problem.solver)
             except AttributeError:
-                # This should work for newer
-                self._problem=problem.clone(problem)
+                try:
+                    # This should work for older OptLang model
+                    self._problem=problem.interface.Model.clone(problem)
+                except AttributeError:
+                    # This should work for newer
+                    self._problem=problem.clone(problem)
 
         # Get the variables and set the maximum bounds for search.
         self._variables=[VWrapper(v,self._problem) for v in variables]
@@ -60,35 +117,327 @@ class LatticeGraph(DiGraph):
             if v.ub is None or v.ub > max_value:
                 v.ub=max_value
 
-        # TODO: Multi-Threaded Pool of Searchers?
-        self.searcher=Search(self._problem,self._variables,eps=self.EPS)
+        # Counters and timers shared with the searchers, and the trace event sink
+        self.stats=Stats()
+        self._sink=sink
+
+        if presolve:
+            with self.stats.timer('presolve'):
+                res=_presolve(self._problem,[x for v in self._variables for x in v.vars])
+            self.stats.count('presolve_variables',res['variables'])
+            self.stats.count('presolve_constraints',res['constraints'])
+        if nullspace:
+            with self.stats.timer('nullspace'):
+                self._problem=_reparametrize(self._problem,[x for v in self._variables for x in v.vars])
+            self._variables=[VWrapper(v,self._problem) for v in self._variables]
+        # Per-LP timeout, time.monotonic() deadline, LP count and stop callback of the current solve, see fea.Search
+        self._lp_timeout=None
+        self._deadline=None
+        self._lp_end=None
+        self._stop=None
+        # Events for iter_solve, None unless it is running
+        self._events=None
+
+        # Each searcher owns exactly one solver model. The local searcher takes over the graph's problem, pool workers get a pickled copy each
+        if searcher is not None and (processes is None or processes>1 or self._searcher_class is not Search or type(searcher) is not Search or searcher.m is not self._problem):
+            raise ValueError('Only a local optlang searcher on the graph\'s own problem can be taken over')
+        if processes is not None and processes<=1:
+            if searcher is None:
+                self.searcher=self._searcher_class(self._problem,self._variables,eps=self.EPS,clone=False,persistent=persistent,stats=self.stats)
+            else:
+                self.searcher=searcher
+                self.searcher.stats=self.stats
+            self.searcher.sink=sink
+            self.pool=None
+        else:
+            self.searcher=None
+            self.pool=SearchPool(self._problem,self._variables,processes=processes,eps=self.EPS,persistent=persistent,searcher=self._searcher_class,stats=self.stats)
+            self.pool.sink=sink
+            # The workers solve on copies of their own, so a problem the graph made itself is only kept pickled meanwhile
+            if clone or nullspace:
+                self._model_pickle=pickle.dumps((self._model,self._model_variables))
+                self._model=self._model_variables=None
         super().__init__()
         self.reset()
+        if prior is not None:
+            self._seed(prior)
 
-    # def hot_restart(self):
-    #         if len(self.queue)>0:
-    #             raise ExecutionError('Already have searchers')
-            
-    #         nodes=self.nodes
-    #         for n in nodes:
-    #             if n in self:
-    #                 if not n.real:
-    #                     self.remove_node(n)
-    #                 elif not self.node[n].get('complete',False):
-    #                     self.queue.add(n)
+    @property
+    def sink(self):
+        """The :class:`fea.TraceSink` receiving trace events, or None"""
+        return self._sink
+    @sink.setter
+    def sink(self,value):
+        self._sink=value
+        if self.searcher is not None:
+            self.searcher.sink=value
+        if self.pool is not None:
+            self.pool.sink=value
+
+    def close(self):
+        """Shut down the searcher pool if there is one and remove the local searcher's halfspace constraints from its model. Later solves fall back to a single local searcher"""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool=None
+        self._release_rows()
+
+    def _hand_over(self):
+        """Internal helper to give the local searcher away, e.g. to the next step of :func:`fea.sweep`, and keep a clone of the problem as it is now instead. Returns the searcher"""
+        self._release_rows()
+        searcher,self.searcher=self.searcher,None
+        self._problem=self._problem.interface.Model.clone(self._problem)
+        self._variables=[VWrapper(v,self._problem) for v in self._variables]
+        return searcher
+
+    def _release_rows(self):
+        """Internal helper to take the local searcher's halfspace rows back out of the problem. The searcher adds them again on its next search"""
+        if self.searcher is not None and self.searcher.H_cons is not None:
+            self.searcher.deactivate()
+            self.searcher.H_cons=None
+
+    @property
+    def _problem(self):
+        """Private. The :class:`optlang.Model` the graph solves. While a :class:`fea.SearchPool` holds copies, one the graph made itself is only kept pickled, and unpickled (with the variables) when it is needed again"""
+        if self._model is None:
+            self._model,variables=pickle.loads(self._model_pickle)
+            self._model_variables=[VWrapper(v,self._model) for v in variables]
+            self._model_pickle=None
+        return self._model
+    @_problem.setter
+    def _problem(self,value):
+        self._model=value
+
+    @property
+    def _variables(self):
+        """Private. The target variables, as :class:`fea.VWrapper` objects on the problem"""
+        self._problem
+        return self._model_variables
+    @_variables.setter
+    def _variables(self,value):
+        self._model_variables=value
+
+    def memory_footprint(self):
+        """Estimate the memory held for this graph, e.g. to size worker pools
+
+        The graph itself only holds numbers: the halfspace vectors, the node sets, their indexes and the completeness sets. Solver models belong to the searchers, one each.
+        The local searcher solves on the graph's problem. With a :class:`fea.SearchPool` every worker holds a copy instead, and the graph keeps a problem it made itself only pickled.
+        A live model mostly lives inside the solver library, out of reach of python, so its pickled size stands in for it. Expect the live model to take more. Pickling it takes a moment on large models.
+        Nothing is changed to measure it, so the model is counted with any halfspace rows the local searcher has in it at the time
+
+        Returns
+        -------
+        A dictionary of estimated bytes for the 'halfspaces', the 'nodes' (with their attributes and edges), the 'indexes' (rows, lookups, levels, the vertices of each halfspace and any :class:`fea.HalfspaceRegistry`),
+        the 'completeness' sets, one copy of the problem as pickled ('model') and the pickled problem the graph keeps while a pool runs ('pickled').
+        Also the number of live 'models' in this process and of the pool's 'workers', which hold a copy each, and the 'total' for this process
+        """
+        halfspaces=set(h for n in self.nodes() for h in n)
+        res={
+            'halfspaces':sum(h.norm.nbytes+h.point.nbytes+sys.getsizeof(h.__dict__) for h in halfspaces),
+            'nodes':sum(sys.getsizeof(n)+sys.getsizeof(n.__dict__)+sys.getsizeof(self.node[n])+sys.getsizeof(self.edge[n]) for n in self.nodes()),
+            'indexes':self._facet_rows.nbytes+self._vertex_rows.nbytes+sys.getsizeof(self._node_ids)+sys.getsizeof(self._canonical_nodes)
+                +sum(sys.getsizeof(d)+sum(sys.getsizeof(x) for x in d.values()) for d in self._nodes_by_level)
+                +sys.getsizeof(self._halfspace_vertices)+sum(sys.getsizeof(x) for x in self._halfspace_vertices.values())
+                +(0 if self._registry is None else self._registry.nbytes),
+            'completeness':sum(sys.getsizeof(x) for x in (self._complete_halfspaces,self._complete_vertices,self._facet_halfspaces,self._changed_halfspaces,self._changed_vertices)),
+            'models':0 if self._model is None else 1,
+            'workers':0 if self.pool is None else len(self.pool),
+            'pickled':0 if self._model_pickle is None else len(self._model_pickle),
+        }
+        res['model']=res['pickled'] or len(pickle.dumps((self._model,self._model_variables)))
+        res['total']=res['halfspaces']+res['nodes']+res['indexes']+res['completeness']+res['models']*res['model']+res['pickled']
+        return res
+
+    def __getstate__(self):
+        """Pickle everything but the searchers. The problem and halfspaces travel as OptLang models and constraints"""
+        # The problem is shared with the local searcher, so leave its rows behind
+        self._release_rows()
+        state=self.__dict__.copy()
+        state['searcher']=None
+        state['pool']=None
+        state['_sink']=None
+        # Trace ids only need to be unique, so hand the next one over to the copy
+        state['_trace_iter']=next(self._trace_iter)
+        return state
+
+    def __setstate__(self,state):
+        """Restore a pickled graph. Variables are re-attached to the unpickled problem and a searcher is created on the next search"""
+        self.__dict__.update(state)
+        self._trace_iter=iter(count(state['_trace_iter']))
+        self._variables=[VWrapper(v,self._problem) for v in self._variables]
+
+    _checkpoint_version=1
+
+    def save_checkpoint(self,path):
+        """
+        Save the state of the graph so a long solve can be picked up again with :func:`resume`
+
+        Halfspaces (norm, point, real flag, eps and required halfspaces), nodes, edges and their trace/searched/complete attributes, the search queue and the f-vector are written as numpy arrays to one compressed .npz file. Nothing is pickled
+
+        Parameters
+        ----------
+        path: str or file
+            Where to write the checkpoint
+        """
+        nodes=list(self.nodes())
+        node_index={n:i for i,n in enumerate(nodes)}
+
+        # Every halfspace used by a node, or required by one, oldest first
+        halfspaces=set()
+        stack=[h for n in nodes for h in n]
+        while stack:
+            h=stack.pop()
+            if h not in halfspaces:
+                halfspaces.add(h)
+                stack.extend(h.required_halfspaces)
+        halfspaces=sorted(halfspaces,key=attrgetter('id'))
+        hs_index={h:i for i,h in enumerate(halfspaces)}
+
+        ptr=lambda groups: np.array([0]+list(accumulate(len(g) for g in groups)),dtype=int)
+        members=lambda groups: np.array([hs_index[h] for g in groups for h in g],dtype=int)
+        edges=self.edges(data=True)
+        arrays={
+            'version':self._checkpoint_version,
+            'n':self.N,
+            'eps':self.EPS,
+            'max_value':self._max_value,
+            'iterations':self._iterations,
+            'next_trace':next(self._trace_iter),
+            'variables':np.array([v.name for v in self._variables]),
+            'halfspace_norm':np.array([h.norm for h in halfspaces],dtype=float).reshape(len(halfspaces),self.N),
+            'halfspace_point':np.array([h.point for h in halfspaces],dtype=float).reshape(len(halfspaces),self.N),
+            'halfspace_real':np.array([h.real for h in halfspaces],dtype=bool),
+            'halfspace_eps':np.array([h.eps for h in halfspaces],dtype=float),
+            'required_ptr':ptr([h.required_halfspaces for h in halfspaces]),
+            'required':members([h.required_halfspaces for h in halfspaces]),
+            'node_ptr':ptr(nodes),
+            'node_members':members(nodes),
+            'node_trace':np.array([self.node[n].get('trace',0) for n in nodes],dtype=int),
+            'node_complete':np.array([self.node[n].get('complete',False) for n in nodes],dtype=bool),
+            'node_complete_children':np.array([self.node[n].get('_complete_children',0) for n in nodes],dtype=int),
+            'edge_from':np.array([node_index[u] for u,v,d in edges],dtype=int),
+            'edge_to':np.array([node_index[v] for u,v,d in edges],dtype=int),
+            'edge_trace':np.array([d.get('trace',0) for u,v,d in edges],dtype=int),
+            'edge_searched':np.array([d.get('searched',-1) for u,v,d in edges],dtype=int),
+            'queue':np.array([node_index[n] for n in self.queue],dtype=int),
+            'f_vector':np.array(self._f_vector,dtype=int),
+            'complete_halfspaces':np.array([hs_index[h] for h in self._complete_halfspaces],dtype=int),
+            'complete_vertices':np.array([node_index[v] for v in self._complete_vertices],dtype=int),
+        }
+
+        if isinstance(path,str):
+            with open(path,'wb') as f:
+                np.savez_compressed(f,**arrays)
+        else:
+            np.savez_compressed(path,**arrays)
+        log.info('Saved checkpoint with '+str(len(nodes))+' nodes and '+str(len(halfspaces))+' halfspaces')
+
+    @classmethod
+    def resume(cls,path,problem,variables=None,**kwargs):
+        """
+        Rebuild a graph saved with :func:`save_checkpoint`
+
+        The searchers start on the given problem and :func:`solve` carries on from the saved queue, so none of the earlier searches are repeated
+
+        Parameters
+        ----------
+        path: str or file
+            The checkpoint to load
+        problem : :class:`OptLang.Model`
+            The problem the checkpoint was made from
+        variables : iterable
+            The target variables, in the original order. Defaults to looking up the saved variable names in the problem (its reactions for Cameo and CobraPy models)
+        kwargs
+            Other arguments for :class:`fea.LatticeGraph` (processes, clone, bitset, persistent, backend). max_value and eps always come from the checkpoint
+
+        Returns
+        -------
+        The resumed :class:`fea.LatticeGraph`
+        """
+        with np.load(path,allow_pickle=False) as f:
+            data={k:f[k] for k in f.files}
+        if int(data['version'])!=cls._checkpoint_version:
+            raise ValueError('Unsupported checkpoint version '+str(data['version']))
+
+        names=[str(name) for name in data['variables']]
+        if variables is None:
+            reactions=getattr(problem,'reactions',None)
+            if reactions is not None:
+                variables=[reactions.get_by_id(name) for name in names]
+            else:
+                variables=[getattr(problem,'solver',problem).variables[name] for name in names]
+        elif len(variables)!=len(names):
+            raise ValueError('Checkpoint has '+str(len(names))+' variables but '+str(len(variables))+' were given')
+
+        graph=cls(problem,variables,max_value=float(data['max_value']),eps=float(data['eps']),**kwargs)
+        graph._load_checkpoint(data)
+        return graph
+
+    def _load_checkpoint(self,data):
+        """Internal helper to replace the graph with the state from a checkpoint, as read by :func:`resume`"""
+        if int(data['n'])!=self.N:
+            raise ValueError('Checkpoint is for '+str(int(data['n']))+' dimensions, not '+str(self.N))
+        self._empty()
+
+        halfspaces=[Halfspace(norm,point,real=bool(real),eps=float(eps)) for norm,point,real,eps in
+            zip(data['halfspace_norm'],data['halfspace_point'],data['halfspace_real'],data['halfspace_eps'])]
+        ptr,req=data['required_ptr'],data['required']
+        for i,h in enumerate(halfspaces):
+            h.required_halfspaces=set(halfspaces[j] for j in req[ptr[i]:ptr[i+1]])
+
+        ptr,members=data['node_ptr'],data['node_members']
+        nodes=[Node([halfspaces[j] for j in members[ptr[i]:ptr[i+1]]],n=self.N,eps=self.EPS,registry=self._registry) for i in range(len(ptr)-1)]
+        for node,trace,complete,children in zip(nodes,data['node_trace'],data['node_complete'],data['node_complete_children']):
+            attrs={'trace':int(trace),'complete':bool(complete)}
+            if children:
+                attrs['_complete_children']=int(children)
+            self._insert_node(node,**attrs)
+            if len(node)==0:
+                self._polytope_node=node
+
+        for u,v,trace,searched in zip(data['edge_from'],data['edge_to'],data['edge_trace'],data['edge_searched']):
+            attrs={'trace':int(trace)}
+            if searched>=0:
+                attrs['searched']=int(searched)
+            super().add_edge(nodes[u],nodes[v],**attrs)
+
+        for i in data['queue']:
+            self.queue.add(nodes[i])
+        self._f_vector=[int(f) for f in data['f_vector']]
+        self._complete_halfspaces=set(halfspaces[i] for i in data['complete_halfspaces'])
+        self._complete_vertices=set(nodes[i] for i in data['complete_vertices'])
+        self._changed_vertices=set()
+        self._changed_halfspaces=set()
+        self._iterations=int(data['iterations'])
+        self._trace_iter=iter(count(int(data['next_trace'])))
+        log.info('Resumed checkpoint with '+str(len(nodes))+' nodes and '+str(len(halfspaces))+' halfspaces')
 
     def reset(self):
         """Completely clear the graph to its initial state"""
+        self._empty()
+
+        # Seed the graph with the Polytope Node (empty set)
+        self._polytope_node=Node(n=self.N,eps=self.EPS,registry=self._registry)
+        self.add_node(self._polytope_node, trace=0)
+
+    def _empty(self):
+        """Internal helper to clear the graph and all of its indexes, without even the Polytope Node"""
         self.clear()
+        self._node_ids={}
+        self._canonical_nodes={}
+        self._nodes_by_level=[{(r,c):set() for r in (True,False) for c in (True,False)} for l in range(self.N+1)]
         self._iterations=0
         self._trace_iter=iter(count())
         self._f_vector=[0 for i in range(self.N+1)]
         self._complete_halfspaces=set()
-        self.queue=SortedListWithKey([],key=lambda n: n.sort_key)
-
-        # Seed the graph with the Polytope Node (empty set)
-        self._polytope_node=Node(n=self.N,eps=self.EPS)
-        self.add_node(self._polytope_node, trace=0)
+        self._complete_vertices=set()
+        self._halfspace_vertices={}
+        self._facet_halfspaces=set()
+        self._changed_vertices=set()
+        self._changed_halfspaces=set()
+        self._facet_rows=RowMatrix(self.N+2)
+        self._vertex_rows=RowMatrix(self.N)
+        self._registry=HalfspaceRegistry() if self._bitset else None
+        self.queue=SortedListWithKey([],key=attrgetter('sort_key'))
 
 #>>>>>>>>>>>>>>>>>>>>>>>>>>>>>> Basic Graph Properties <<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
     @property
@@ -167,6 +516,41 @@ class LatticeGraph(DiGraph):
         """Boolean value indicating whether the Lattice Graph appears complete or whether missing nodes remain to be found"""
         return np.all(np.greater_equal(self.f_vector,self._minimum_f_vector)) and self.modified_euler_characteristic==0
 
+    @property
+    def remaining(self):
+        """Rough estimate of how far the graph is from complete: the fraction of real edges found so far which don't have both of their vertices yet. 0 once complete, 1 before any edge is found"""
+        if self.complete:
+            return 0.0
+        edges=self.get_nodes_of_level(self.EDGE_LEVEL,real=True)
+        if len(edges)==0:
+            return 1.0
+        return sum(1 for e in edges if len(self.successors(e,real=True))<2)/len(edges)
+
+    def inner_approximation(self):
+        """The points of the real vertices found so far, or of the complete subgraph once the graph is complete
+
+        Their convex hull lies inside the polytope, and is the polytope once the graph is complete
+
+        Returns
+        -------
+        A :class:`numpy.ndarray` with one vertex per row
+        """
+        vertices=sorted(self.get_vertices(real=True,complete=True if self.complete else None),key=attrgetter('id'))
+        return np.array([v.point for v in vertices]).reshape(len(vertices),self.N)
+
+    def outer_approximation(self):
+        """The real facets found so far, or those of the complete subgraph once the graph is complete
+
+        Every point of the polytope satisfies A x >= b, and the polytope is exactly that once the graph is complete (while few facets are known it may be unbounded)
+
+        Returns
+        -------
+        A, b : :class:`numpy.ndarray`
+            The facet normals, one per row, and their right-hand sides
+        """
+        facets=sorted((next(iter(f)) for f in self.get_facets(real=True,complete=True if self.complete else None)),key=attrgetter('id'))
+        return np.array([h.norm for h in facets]).reshape(len(facets),self.N),np.array([h.rhs for h in facets],dtype=float)
+
     def __str__(self):
         """String representation of the current graph"""
         nodes=sorted(self.nodes(),key=lambda x: x.sort_key, reverse=True)
@@ -189,31 +573,23 @@ class LatticeGraph(DiGraph):
         All added nodes will be automatically connected to appropriate parent and child nodes. The f-vector will be updated accordingly
         """
         if not isinstance(node,Node) or node in self or not node.valid_domain:
-            raise ValueError('Invalid node for addition:\n'+str(node))
+            raise ValueError('Invalid node for addition: '+repr(node))
+        self.stats.count('add_node')
         if 'trace' not in kwargs:
             kwargs['trace']=self._trace
         is_recurse=kwargs.pop('_recurse',False)
 
         # Additional checks required for adding vertices
         if node.level==self.VERTEX_LEVEL and node.real:
-            other_facets=set()
-            for f in self.get_facets(complete=None):
-                if node.vertex_has_facet(f):
-                    other_facets|=f
-                other_facets-=node
+            other_facets=set(h for h in self._facets_containing(node.point) if h not in node)
             if len(other_facets)>0:
                 node = node | other_facets
-                log.info('Adding facets '+','.join([repr(f) for f in other_facets])+' to form '+repr(node))
-                
+
                 for v in self.get_vertices(complete=None):
                     if v<=node:
-                        log.info('Removing subset vertex '+repr(v)+' in favor of '+repr(node))
                         self.remove_node(v)
 
-
-        log.info('Adding '+repr(node))
-        node._graph_add(self)
-        super().add_node(node, **kwargs)
+        self._insert_node(node,**kwargs)
         
         if node.level>self.VERTEX_LEVEL:
             self.queue.add(node)
@@ -221,7 +597,7 @@ class LatticeGraph(DiGraph):
         # Search for all possible parents and connect to them. Be very careful with psuedo facets. We *MUST NOT* propogate psuedo facets UP the graph!
         if node.level<self.N:
             for potential_parent in combinations(node, self.N-node.level-1):
-                pnode=Node(potential_parent, n=self.N, eps=self.EPS)
+                pnode=Node(potential_parent, n=self.N, eps=self.EPS, registry=self._registry)
                 if pnode in self:
                     if not self.has_edge(pnode,node):
                         self.add_edge(pnode, node, trace=kwargs['trace'])
@@ -236,10 +612,11 @@ class LatticeGraph(DiGraph):
         # If it's a real facet, then check all vertices and add accordingly
         if node.level==self.FACET_LEVEL and node.real:
             facet, = node
-            for v in self.get_vertices(complete=None):
-                if not node <= v and node.facet_has_vertex(v):
-                    log.info('Updating vertex '+repr(v)+' to include '+repr(facet))
-                    nodedict = self.node[v]
+            for v in self._vertices_on(facet):
+                # Merging one vertex can take another one at the same point with it
+                if v in self and facet not in v:
+                    # The merged vertex works out its own completeness, and counts towards the f-vector again when it does
+                    nodedict = {k:a for k,a in self.node[v].items() if k!='complete'}
                     nodedict['_recurse']=True
                     self.remove_node(v, _recurse=True)
                     self.add_node(node | v, **nodedict)
@@ -265,6 +642,7 @@ class LatticeGraph(DiGraph):
         """
         is_recurse=kwargs.get('_recurse',False)
         node._graph_remove()
+        self.stats.count('remove_node')
 
         if not is_recurse:
             node=self.get_node(node)
@@ -277,24 +655,25 @@ class LatticeGraph(DiGraph):
                 pass # It's already been deleted
 
         # Remove this node
-        log.info('Removing '+repr(node))
         if node not in self:
-            raise ValueError('Invalid node for deletion:\n'+str(node))
+            raise ValueError('Invalid node for deletion: '+repr(node))
         elif self.node[node].get('complete',False):
             self._f_vector[node.level]-=1
             pred_inherit=self.predecessors(node,real=True)
 
             super().remove_node(node)
+            self._forget_node(node)
             self.queue.discard(node)
             
             for p in pred_inherit:
-                self.node[p]['_complete_children'] = min(0,self.node[p].get('_complete_children',0)-1)
+                self.node[p]['_complete_children'] = max(0,self.node[p].get('_complete_children',0)-1)
                 self._update_node_completeness(p)
 
             if not is_recurse:
                 self._update_graph_completeness()
         else:
             super().remove_node(node)
+            self._forget_node(node)
             self.queue.discard(node)
             
             if not is_recurse:
@@ -304,6 +683,87 @@ class LatticeGraph(DiGraph):
         if not is_recurse:
             self._update_graph_completeness()
 
+    def _insert_node(self,node,**kwargs):
+        """Internal helper to put a node into the graph and its indexes without connecting it to anything"""
+        node._graph_add(self)
+        super().add_node(node, **kwargs)
+        self._node_ids[node.id]=node
+        self._canonical_nodes[node]=node
+        self._nodes_by_level[node.level][(node.real,self.node[node].get('complete',False))].add(node)
+        self._track_incidence(node)
+        if self._sink is not None:
+            self._sink.node('node_added',node,level=node.level,trace=kwargs.get('trace'))
+        if self._events is not None and node.real:
+            if node.level==self.FACET_LEVEL:
+                self._events.append(SolveEvent('facet',node,next(iter(node))))
+            elif node.level==self.VERTEX_LEVEL:
+                self._events.append(SolveEvent('vertex',node,None))
+
+    def _forget_node(self,node):
+        """Internal helper to drop a removed node from the id and canonical node indexes"""
+        node=self._canonical_nodes.pop(node)
+        if self._sink is not None:
+            self._sink.emit('node_removed',id=node.id)
+        if self._events is not None and node.real and node.level in (self.FACET_LEVEL,self.VERTEX_LEVEL):
+            self._events.append(SolveEvent('removed',node,None))
+        del self._node_ids[node.id]
+        for c in (True,False):
+            self._nodes_by_level[node.level][(node.real,c)].discard(node)
+        self._track_incidence(node,remove=True)
+
+    def _track_incidence(self,node,remove=False):
+        """Internal helper to keep the vertex-halfspace incidences and the point/facet matrices of real vertices and facets up to date
+
+        Changed vertices and halfspaces are remembered until the next :func:`_update_graph_completeness`
+        """
+        if not node.real:
+            return
+        if node.level==self.VERTEX_LEVEL:
+            if remove:
+                self._vertex_rows.remove(node)
+            else:
+                self._vertex_rows.add(node,node.point)
+            for h in node:
+                if remove:
+                    self._halfspace_vertices[h].discard(node)
+                    if not self._halfspace_vertices[h]:
+                        del self._halfspace_vertices[h]
+                else:
+                    self._halfspace_vertices.setdefault(h,set()).add(node)
+            self._changed_vertices.add(node)
+        if node.level==self.FACET_LEVEL:
+            if remove:
+                self._facet_halfspaces-=node
+            else:
+                self._facet_halfspaces|=node
+            for h in node:
+                if remove:
+                    self._facet_rows.remove(h)
+                else:
+                    self._facet_rows.add(h,np.append(h.norm,[h.rhs,h.eps]))
+            self._changed_halfspaces|=node
+
+    def _facets_containing(self,point):
+        """Internal helper to get the halfspaces of all real facets which contain a point, within their eps"""
+        A=self._facet_rows.data
+        hits=np.abs(A[:,:-2].dot(point)-A[:,-2])<=A[:,-1]
+        return [self._facet_rows.keys[i] for i in np.flatnonzero(hits)]
+
+    def _vertices_on(self,halfspace):
+        """Internal helper to get all real vertices which lie on a halfspace, within its eps"""
+        hits=np.abs(self._vertex_rows.data.dot(halfspace.norm)-halfspace.rhs)<=halfspace.eps
+        return [self._vertex_rows.keys[i] for i in np.flatnonzero(hits)]
+
+    def _set_node_complete(self,node,complete):
+        """Internal helper to set the complete attribute of a node and move it to the matching level index"""
+        self._nodes_by_level[node.level][(node.real,self.node[node].get('complete',False))].discard(node)
+        self.node[node]['complete']=complete
+        self._nodes_by_level[node.level][(node.real,complete)].add(node)
+        if self._sink is not None:
+            self._sink.emit('node_complete',id=self.get_node(node).id,complete=complete)
+        if self._events is not None and complete:
+            self._events.append(SolveEvent('complete',self.get_node(node),None))
+
     def add_edge(self,nodefrom,nodeto,**kwargs):
         """
         Connect a parent node (higher level) to a child node (lower level).
@@ -313,14 +773,11 @@ class LatticeGraph(DiGraph):
         nodefrom, nodeto : :class:`fea.Node`
             Nodes to connect in lattice graph
         """
-        if log.getEffectiveLevel() <= 10:
-            # Only need the actual nodes if we're logging. Kind of expensive hence the check
-            nodefrom, nodeto = self.get_node(nodefrom), self.get_node(nodeto)
-            log.info('Adding edge '+repr(nodefrom)+'->'+repr(nodeto))
-
         if not kwargs.get('trace',False):
             kwargs['trace']=self._trace
         super().add_edge(nodefrom, nodeto, **kwargs)
+        if self._sink is not None:
+            self._sink.emit('edge_added',trace=kwargs['trace'],**{'from':self.get_node(nodefrom).id,'to':self.get_node(nodeto).id})
 
         if self.node[nodeto].get('complete',False):
             self.node[nodefrom]['_complete_children']=self.node[nodefrom].get('_complete_children',0)+1
@@ -377,15 +834,8 @@ class LatticeGraph(DiGraph):
         The specified node object or None if it does not exist
         """
         if isinstance(node,int):
-            for n in self.nodes_iter():
-                if n.id==node:
-                    return n
-        elif node in self:
-            # Requires iterating the whole stinkin graph in the worst case
-            for n in self.node.keys():
-                if n==node:
-                    return n
-        return None
+            return self._node_ids.get(node)
+        return self._canonical_nodes.get(node)
 
     def get_nodes_of_level(self,level,connected=None,real=None,complete=None):
         """Get all nodes of a given level
@@ -424,10 +874,10 @@ class LatticeGraph(DiGraph):
             elif connected.level==level:
                 if (real is None or connected.real==real) and (complete is None or self.node[connected].get('complete',False)==complete):
                     res.add(connected)
-        else:
-            for n in self.nodes_iter():
-                if n.level==level and (real is None or n.real==real) and (complete is None or self.node[n].get('complete',False)==complete):
-                    res.add(n)
+        elif 0<=level<=self.N:
+            for (r,c),nodes in self._nodes_by_level[level].items():
+                if (real is None or r==real) and (complete is None or c==complete):
+                    res|=nodes
         return res
 
     def get_vertices(self,node=None,real=True,complete=True,pandas=False):
@@ -448,7 +898,6 @@ class LatticeGraph(DiGraph):
         -------
         A list of all vertices
         """
-        # TODO: Maintain list of these? This is an expensive step that is oft repeated
         if pandas:
             res=[]
             for n in self.get_nodes_of_level(self.VERTEX_LEVEL,connected=node,real=real,complete=complete):
@@ -476,7 +925,6 @@ class LatticeGraph(DiGraph):
         -------
         A list of all facets
         """
-        # TODO: Maintain list of these? This is an expensive step that is oft repeated
         if pandas:
             res=[]
             for n in self.get_nodes_of_level(self.FACET_LEVEL,connected=node,real=real,complete=complete):
@@ -486,7 +934,7 @@ class LatticeGraph(DiGraph):
         return self.get_nodes_of_level(self.FACET_LEVEL,connected=node,real=real,complete=complete)
 
 #>>>>>>>>>>>>>>>>> Functions for Searching/Solving the Graph <<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
-    def solve(self,max_iter=50,exhaust=False):
+    def solve(self,max_iter=50,exhaust=False,time_budget=None,lp_budget=None,lp_timeout=None,stop=None):
         """
         Solve the LatticeGraph to find the complete solution
 
@@ -496,23 +944,34 @@ class LatticeGraph(DiGraph):
             Max number of iterations before stopping
         exhaust: bool
             Whether to exhaust all edge searches or whether to stop when hueristics indicate we're done
+        time_budget: float
+            Seconds of wall-clock time to stop after. LPs are cut short at the deadline too. Default None, unlimited
+        lp_budget: int
+            Number of LP solves (including retries) to stop after. Default None, unlimited
+        lp_timeout: float
+            Seconds any single LP may take. GLPK rounds this up to whole seconds. Default None, unlimited
+        stop: callable
+            Called without arguments before every search (or batch of searches). Solving stops as soon as it returns True, e.g. when a caller cancels. Default None
 
         Returns
         --------
         The number of iterations it took to solve
+
+        Notes
+        -----
+        When the graph has a :class:`fea.SearchPool`, the first nodes in the queue are searched together (one per searcher) and each batch counts towards max_iter once per node, so a batch may go over lp_budget.
+
+        A search which runs out of time leaves its node in the queue, so solve can be called again to carry on. Until the graph is complete, :attr:`remaining`, :func:`inner_approximation` and :func:`outer_approximation` describe what was found so far
         """
+        self._set_limits(time_budget,lp_budget,lp_timeout,stop)
         ind=0
-        while len(self.queue)>0 and ind<max_iter and (exhaust or (self.queue[0].level==1 and self.queue[0].real) or not self.complete):
-            newsearch=self.queue[0]
-            res=self.search(newsearch)
+        try:
+            with self.stats.timer('solve'):
+                for ind in self._solve(max_iter,exhaust):
+                    pass
+        finally:
+            self._set_limits()
 
-            if res:
-                log.info('Done @ '+str(ind)+'\n\n')
-                ind+=1
-            else:
-                log.info('Done & Exhausted Node @ '+str(ind)+'\n\n')
-                self.queue.discard(newsearch)
-                
         if log.getEffectiveLevel()<=10:
             log.info('Complete:'+str(self.complete)+' QueueLength:'+str(len(self.queue)))
             log.info('Finished Search after '+str(ind)+' iterations with f_vector:'+str(self.f_vector)+'='+str(self.modified_euler_characteristic))
@@ -521,6 +980,72 @@ class LatticeGraph(DiGraph):
         self._iterations+=ind
         return ind
 
+    def iter_solve(self,max_iter=50,exhaust=False,time_budget=None,lp_budget=None,lp_timeout=None,stop=None):
+        """
+        Solve the LatticeGraph like :func:`solve`, yielding what is found along the way
+
+        Events are yielded after each search (or batch of searches on a :class:`fea.SearchPool`), once the graph is consistent again. Stopping the iteration at any point leaves a graph which :func:`solve` or iter_solve can carry on from
+
+        Parameters
+        ----------
+        max_iter, exhaust, time_budget, lp_budget, lp_timeout, stop:
+            As for :func:`solve`
+
+        Yields
+        ------
+        :class:`fea.SolveEvent` tuples of (kind, node, halfspace) for the facets, vertices, completed nodes and pseudo halfspaces found. Only changes made during the iteration are reported
+
+        Returns
+        -------
+        The number of iterations, as the value of the final StopIteration
+        """
+        self._set_limits(time_budget,lp_budget,lp_timeout,stop)
+        self._events=[]
+        ind=0
+        try:
+            for ind in self._solve(max_iter,exhaust):
+                events,self._events=self._events,[]
+                yield from events
+        finally:
+            self._events=None
+            self._set_limits()
+            self._iterations+=ind
+        return ind
+
+    def _set_limits(self,time_budget=None,lp_budget=None,lp_timeout=None,stop=None):
+        """Internal helper to start the budgets of a solve, or clear them"""
+        self._lp_timeout=lp_timeout
+        self._deadline=None if time_budget is None else time.monotonic()+time_budget
+        self._lp_end=None if lp_budget is None else self.stats['lp']+lp_budget
+        self._stop=stop
+
+    def _solve(self,max_iter,exhaust):
+        """Internal helper running the search loop of :func:`solve`. Yields the number of iterations so far after every batch of searches"""
+        ind=0
+        while len(self.queue)>0 and ind<max_iter and (exhaust or (self.queue[0].level==1 and self.queue[0].real) or not self.complete):
+            if self._deadline is not None and time.monotonic()>=self._deadline:
+                log.info('Stopping at the time budget')
+                break
+            if self._lp_end is not None and self.stats['lp']>=self._lp_end:
+                log.info('Stopping at the LP budget')
+                break
+            if self._stop is not None and self._stop():
+                log.info('Stopped')
+                break
+            if self.pool is None:
+                batch=[self.queue[0]]
+            else:
+                batch=list(self.queue.islice(0,min(len(self.pool),max_iter-ind)))
+            self.stats.queue_lengths.append(len(self.queue))
+
+            for newsearch,res in zip(batch,self.search_many(batch)):
+                if res or res is None:
+                    ind+=1
+                else:
+                    # Exhausted node
+                    self.queue.discard(newsearch)
+            yield ind
+
     def search(self,node=None):
         """
         Perform a single search to find another node in the LatticeGraph
@@ -536,17 +1061,142 @@ class LatticeGraph(DiGraph):
         """
         if node is None:
             node=self.queue[0]
+        return self.search_many([node])[0]
 
-        if log.getEffectiveLevel()<=10:
-            log.info('Searching { f_vector:'+str(self.f_vector)+'='+str(self.modified_euler_characteristic)+'} for '+repr(node))
+    def search_many(self,nodes):
+        """
+        Search from several nodes at once and merge every new halfspace into the graph
+
+        The searches run on the :class:`fea.SearchPool` if the graph has one, otherwise one after another on the local searcher
+
+        Parameters
+        ----------
+        nodes: iterable of :class:`fea.Node`
+            Nodes to search from
 
-        # If it's a vertex
+        Returns
+        --------
+        A list with, for each node, True if a new node was found, False if not, or None if the search ran out of time or the graph changed under it, so its result was dropped
+        """
+        nodes=list(nodes)
+        results=[False]*len(nodes)
+
+        searches=[]
+        for i,node in enumerate(nodes):
+            obj=self._search_direction(node)
+            if obj is not None:
+                trace=self._trace
+                if self._sink is not None:
+                    self._sink.emit('search',node=node.id,trace=trace,direction=obj)
+                searches.append((i,node,obj,trace))
+
+        if self.pool is None:
+            searcher=self._local_searcher()
+            searcher.timeout,searcher.deadline=self._lp_timeout,self._deadline
+            halfspaces=[]
+            for i,node,obj,trace in searches:
+                searcher.lp_limit=self._lp_limit()
+                searcher.trace=trace
+                searcher.set(obj,node)
+                if searcher.get_solution():
+                    halfspaces.append(searcher.bounding_halfspace())
+                else:
+                    halfspaces.append(False if searcher.timed_out else None)
+        else:
+            self.pool.timeout,self.pool.deadline,self.pool.lp_limit=self._lp_timeout,self._deadline,self._lp_limit()
+            halfspaces=self.pool.map([(obj,node) for i,node,obj,trace in searches],traces=[trace for i,node,obj,trace in searches])
+
+        for (i,node,obj,trace),halfspace in zip(searches,halfspaces):
+            if halfspace is False:
+                # Out of time, leave the node queued for the next solve
+                results[i]=None
+                continue
+            if halfspace is None:
+                log.error('Solver Error. Aborting.')
+                continue
+            self.stats.count('real_halfspaces' if halfspace.real else 'pseudo_halfspaces')
+            if self._events is not None and not halfspace.real:
+                self._events.append(SolveEvent('pseudo',node,halfspace))
+            results[i]=self._merge_halfspace(node,halfspace,trace)
+
+        return results
+
+    def _lp_limit(self):
+        """Internal helper to get how many LPs one search may still take under the LP budget of the current solve, or None"""
+        if self._lp_end is None:
+            return None
+        return max(self._lp_end-self.stats['lp'],0)
+
+    def _optimal_points(self,searches):
+        """Internal helper to solve (objective, halfspaces) pairs without changing the graph. Returns the optimal point of each, or None where the solver failed"""
+        searches=list(searches)
+        if self.pool is not None:
+            return self.pool.points(searches,trace=self._trace)
+        searcher=self._local_searcher()
+        searcher.timeout=searcher.deadline=searcher.lp_limit=None
+        searcher.trace=self._trace
+        points=[]
+        for obj,hps in searches:
+            searcher.set(obj,hps)
+            points.append(searcher.vp if searcher.get_solution() else None)
+        return points
+
+    def _local_searcher(self):
+        """Internal helper to get the local searcher, creating it (e.g. after :func:`close` or unpickling) if there is none"""
+        if self.searcher is None:
+            self.searcher=self._searcher_class(self._problem,self._variables,eps=self.EPS,clone=False,persistent=self._persistent,stats=self.stats)
+            self.searcher.sink=self._sink
+        return self.searcher
+
+    def _seed(self,prior):
+        """Internal helper to warm-start the graph from the solution to a similar problem
+
+        Every real facet of the prior is checked by minimizing along its normal (one LP each), which shows whether it still bounds the problem in the same place.
+        Every vertex of the prior whose facets all still bound the problem is then checked by minimizing along the sum of its normals (one LP each), unless one of the facet checks already ended on it,
+        since a constraint which cuts into the prior solution cuts off some of its vertices even if it moves none of the facets.
+        The vertices which are still feasible are their intersections again. A facet is kept if the feasible points found by all these LPs span its hyperplane, so the problem still has a facet there.
+        The kept halfspaces are the prior's own objects. Whatever is kept is added to the graph, and :func:`solve` only has to search where the problem changed
+        """
+        if prior.N!=self.N or [v.name for v in prior._variables]!=[v.name for v in self._variables]:
+            raise ValueError('Prior solution is for different variables')
+
+        facets=sorted((next(iter(f)) for f in prior.get_facets(real=True,complete=None)),key=attrgetter('id'))
+        optima=self._optimal_points((-h.norm,[]) for h in facets)
+        bounding={h:p for h,p in zip(facets,optima) if p is not None and abs(np.dot(h.norm,p)-h.rhs)<=self.EPS}
+        optima=np.array([p for p in optima if p is not None]).reshape(-1,self.N)
+
+        vertices=[v for v in prior.get_vertices(real=True,complete=None) if all(h in bounding for h in v)]
+        # A vertex which one of the optima above landed on is feasible already
+        check=[v for v in vertices if not np.any(np.all(np.abs(optima-v.point)<=self.EPS,axis=1))]
+        points=self._optimal_points((-sum(h.norm for h in v),[]) for v in check)
+        cut=set(v for v,p in zip(check,points) if p is None or any(np.dot(h.norm,p)-h.rhs>self.EPS for h in v))
+        vertices=[v for v in vertices if v not in cut]
+
+        # Every optimum above and every vertex left is a feasible point, and those on a facet's hyperplane show how much of it still bounds the problem
+        feasible=np.concatenate([optima,np.array([p for p in points if p is not None]).reshape(-1,self.N),np.array([v.point for v in vertices]).reshape(-1,self.N)])
+        kept=[]
+        for h in bounding:
+            on=feasible[np.abs(feasible.dot(h.norm)-h.rhs)<=self.EPS]
+            if len(on)>=self.N and np.linalg.matrix_rank(on[1:]-on[0],tol=self.EPS)==self.N-1:
+                kept.append(h)
+        bounding=set(kept)
+        vertices=[v for v in vertices if all(h in bounding for h in v)]
+
+        log.info('Seeding '+str(len(kept))+' of '+str(len(facets))+' facets and '+str(len(vertices))+' vertices from prior solution')
+        for h in kept:
+            self.add_node(Node([h],n=self.N,eps=self.EPS,registry=self._registry))
+        for v in vertices:
+            v=Node(v,n=self.N,eps=self.EPS,registry=self._registry)
+            if v not in self:
+                self.add_node(v)
+
+    def _search_direction(self,node):
+        """Internal helper to find the objective direction for a search from a node. Returns None if the node cannot be searched"""
+        # Vertices and completed edges can't be searched
         if node.level==0:
-            log.info('Vertex. Aborting Solve.')
-            return False
+            return None
         elif node.level==1 and len([s for s in self.successors(node,real=True)])>=2:
-            log.info('Completed Edge. Aborting Solve.')
-            return False
+            return None
 
         # First, find any facets that we already know exist for this node
         knownfacets=set()
@@ -556,83 +1206,135 @@ class LatticeGraph(DiGraph):
             else:
                 knownfacets|=set([f for f in s if f.real])
         knownfacets-=node
-        log.info('Found bounding '+','.join([repr(k) for k in knownfacets])+' for '+repr(node))
-
 
         # Now, look for an objective direction
         try:
-            obj=node.orthogonal_vector(knownfacets)
+            return node.orthogonal_vector(knownfacets)
         except ValueError:
             # We couldn't find a valid/new objective direction. We're done with this node
             log.error('Could not find an orthogonal vector to child nodes!')
-            return False
+            return None
 
-        # Now, we can solve the Problem
-        trace=self._trace
-        log.info('Solving with trace '+str(trace))
-        self.searcher.set(obj,node)
-        optimal=self.searcher.get_solution()
-        if not optimal:
-            log.error('Solver Error. Aborting.')
-            return False
+    def _merge_halfspace(self,node,halfspace,trace):
+        """Internal helper to add the halfspace found by searching from a node. Returns None if the graph no longer allows it"""
+        if node not in self:
+            # An earlier search in the same batch replaced or removed the node
+            if self._sink is not None:
+                self._sink.emit('facet_found',node=node.id,halfspace=halfspace.id,trace=trace,result='stale')
+            return None
 
         # Calculate the new bounding halfspace and make sure we have the real one
-        halfspace = self.searcher.bounding_halfspace()
-        log.info('Found '+str(halfspace))
-        facet=Node([halfspace])
+        facet=Node([halfspace], registry=self._registry)
         if facet in self:
             halfspace, = self.get_node(facet)
-        log.info('Changing to '+str(halfspace))
-
-        child_node=self.add_node( Node( node | set([halfspace]) ), trace=trace)
+        elif self.pool is not None:
+            # Halfspaces from other processes need local ids and must require the local instances
+            halfspace.id=next(Halfspace._id_gen)
+            local={h:h for h in node}
+            halfspace.required_halfspaces=set([local.get(h,h) for h in halfspace.required_halfspaces])
+
+        child=Node( node | set([halfspace]), registry=self._registry )
+        if child in self:
+            if self._sink is not None:
+                self._sink.halfspace(halfspace)
+                self._sink.emit('facet_found',node=node.id,halfspace=halfspace.id,trace=trace,result='existing')
+            return None
+        child_node=self.add_node(child, trace=trace)
         self.edge[node][child_node]['searched']=trace
+        if self._sink is not None:
+            self._sink.emit('facet_found',node=node.id,halfspace=halfspace.id,trace=trace,result='added',child=child_node.id)
 
         return True
 
 #>>>>>>>>>>>>>>>>>>>> Graph and Node Completion Functions <<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<    
-    def _update_graph_completeness(self,**kwargs):
-        """Internal helper method to update the graph completeness/f-vector/etc"""
-        iteration = kwargs.get('_iteration',0)
-        update=False
-
-        if iteration==0:
-            complete_halfspaces, incomplete_halfspaces = set(), set(chain.from_iterable(self.get_facets(real=True,complete=None)))
-            complete_vertices, incomplete_vertices = set(self.get_vertices(real=True,complete=None)) , set()
-
-            # Check Potential Halfspaces for Enough Vertices
-            for ih in incomplete_halfspaces:
-                # Get number of vertices that include it
-                if len([1 for cv in complete_vertices if ih in cv])>=self.N:
-                    complete_halfspaces.add(ih)
-            incomplete_halfspaces-=complete_halfspaces
-            
-        else:
-            complete_halfspaces, incomplete_halfspaces = kwargs['_halfspaces']
-            complete_vertices, incomplete_vertices = kwargs['_vertices']
-
-        # Check Potential Vertices for Enough Halfspaces
-        for cv in complete_vertices:
-            if len(cv & complete_halfspaces) < self.N:
-                incomplete_vertices.add(cv)
-                update=True
-        complete_vertices-=incomplete_vertices
-        
-        # Check Complete Halfspaces for Enough Vertices
-        for ch in complete_halfspaces:
-            # Get number of vertices that include it
-            if len([1 for cv in complete_vertices if ch in cv])<self.N:
-                incomplete_halfspaces.add(ch)
-                update=True
-        complete_halfspaces-=incomplete_halfspaces
-
-        # log.info('Checking completeness iteration '+str(iteration)+'\n'+str())
-        
-        if update and len(complete_halfspaces)>0 and len(complete_vertices)>0:
-            self._update_graph_completeness(_halfspaces=(complete_halfspaces,incomplete_halfspaces),_vertices=(complete_vertices,incomplete_vertices),_iteration=iteration+1)
-        else:
-            self._complete_halfspaces=complete_halfspaces
-            for v in chain(complete_vertices,incomplete_vertices):
-                self._update_node_completeness(v)
+    def _update_graph_completeness(self):
+        """Internal helper method to update the graph completeness/f-vector/etc
+
+        Complete halfspaces and vertices are the largest sets where every vertex holds at least N complete halfspaces and every halfspace lies on at least N complete vertices.
+        Only the incidences changed since the last call are revisited: removals can only shrink these sets and additions can only grow them outwards from the new nodes
+        """
+        with self.stats.timer('completeness'):
+            self._update_completeness_sets()
+
+    def _update_completeness_sets(self):
+        """Internal helper doing the work of :func:`_update_graph_completeness`"""
+        N=self.N
+        H,V=self._complete_halfspaces,self._complete_vertices
+        hv=self._halfspace_vertices
+        eligible=self._facet_halfspaces
+        changed_v=[v for v in self._changed_vertices if v in self]
+        touched=set(changed_v)
+
+        # Shrink: drop anything which has lost its support, and whatever depended on it
+        dropped=set()
+        sv=[v for v in self._changed_vertices if v in V]
+        sh=[h for h in self._changed_halfspaces if h in H]
+        while sv or sh:
+            if sv:
+                v=sv.pop()
+                if v in V and (v not in self or sum(1 for h in v if h in H)<N):
+                    V.discard(v)
+                    sh.extend(h for h in v if h in H)
+            else:
+                h=sh.pop()
+                if h in H and (h not in eligible or sum(1 for v in hv.get(h,()) if v in V)<N):
+                    H.discard(h)
+                    dropped.add(h)
+                    touched.update(hv.get(h,()))
+                    sv.extend(v for v in hv.get(h,()) if v in V)
+
+        # Grow: collect everything reachable from the new nodes through incomplete ones...
+        cand_v,cand_h=set(),set()
+        sv=[v for v in changed_v if v not in V]
+        sh=[h for h in self._changed_halfspaces if h in eligible and h not in H]
+        while sv or sh:
+            if sv:
+                v=sv.pop()
+                if v not in cand_v:
+                    cand_v.add(v)
+                    sh.extend(h for h in v if h in eligible and h not in H and h not in cand_h)
+            else:
+                h=sh.pop()
+                if h not in cand_h:
+                    cand_h.add(h)
+                    sv.extend(v for v in hv.get(h,()) if v not in V and v not in cand_v)
+
+        # ...then prune the candidates which can't be supported
+        sv,sh=list(cand_v),list(cand_h)
+        while sv or sh:
+            if sv:
+                v=sv.pop()
+                if v in cand_v and sum(1 for h in v if h in H or h in cand_h)<N:
+                    cand_v.discard(v)
+                    sh.extend(h for h in v if h in cand_h)
+            else:
+                h=sh.pop()
+                if h in cand_h and sum(1 for v in hv.get(h,()) if v in V or v in cand_v)<N:
+                    cand_h.discard(h)
+                    sv.extend(v for v in hv.get(h,()) if v in cand_v)
+        V|=cand_v
+        H|=cand_h
+        for h in cand_h:
+            touched.update(hv[h])
+
+        self._changed_vertices=set()
+        self._changed_halfspaces=set()
+        for v in touched:
+            self._update_node_completeness(v)
+
+        # The nodes above those vertices holding a halfspace which came or went count it too, even where the vertex didn't change.
+        # Children go first, so each node sees its children's final state
+        stale=set()
+        for h in cand_h|dropped:
+            nodes=[v for v in hv.get(h,()) if v in self]
+            while nodes:
+                for p in self.predecessors(nodes.pop()):
+                    if h in p and p not in stale:
+                        stale.add(p)
+                        nodes.append(p)
+        for n in sorted(stale,key=attrgetter('level')):
+            if n in self:
+                self._update_node_completeness(n)
             
     def _update_node_completeness(self, node):
         """Helper method to update node completeness"""
@@ -642,16 +1344,16 @@ class LatticeGraph(DiGraph):
         if current != possible:
             #Children may be screwed up, make sure they're ok            
             if possible:
-                self.node[node]['complete']=True
+                self._set_node_complete(node,True)
                 self._f_vector[node.level]+=1
                 for p in self.predecessors(node,real=True):
                     self.node[p]['_complete_children']=self.node[p].get('_complete_children',0)+1
                     self._update_node_completeness(p)
             else:
-                self.node[node]['complete']=False
+                self._set_node_complete(node,False)
                 self._f_vector[node.level]-=1
                 for p in self.predecessors(node,real=True):
-                    self.node[p]['_complete_children']=min(0,self.node[p].get('_complete_children',0)-1)
+                    self.node[p]['_complete_children']=max(0,self.node[p].get('_complete_children',0)-1)
                     self._update_node_completeness(p)
 
 #>>>>>>>>>>>>>>>>>>>>>>> Output/Formatting Functions <<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
@@ -672,15 +1374,17 @@ class LatticeGraph(DiGraph):
         newmodel=interface.Model()
 
         if replace_variables:
-            variables=[interface.Variable(v.name,ub=v.ub,lb=v.lb) for v in self._variables]
-            for h in self._complete_halfspaces:
-                newmodel.add(interface.Constraint(np.dot(variables,h.norm),lb=h.rhs,ub=None,name=repr(h)))
+            newmodel.add([interface.Variable(v.name,ub=v.ub,lb=v.lb) for v in self._variables])
+            variables=[VWrapper(newmodel.variables[v.name],newmodel) for v in self._variables]
         else:
-            for h in self._complete_halfspaces:
-                new=h._ol_new_constraint(newmodel,eps=0)
-                new.ub=None
-                new.name=repr(h)
-                newmodel.add(new)
+            # Add the variables first so they keep the order of the original model
+            newmodel.add([interface.Variable.clone(v) for w in self._variables for v in w.vars])
+            variables=[VWrapper(v,newmodel) for v in self._variables]
+
+        halfspaces=sorted(self._complete_halfspaces,key=attrgetter('id'))
+        for h,new in zip(halfspaces,_ol_new_constraints(halfspaces,newmodel,variables)):
+            new.lb=h.rhs
+            new.name=repr(h)
 
         return newmodel
 
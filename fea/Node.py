@@ -2,11 +2,73 @@
 import logging
 log=logging.getLogger('fea.node')
 
+import sys
 import itertools
+from collections import OrderedDict
 
 import numpy as np
 from .util import lstsq
 
+class HalfspaceRegistry:
+    def __init__(self,cache_size=4096):
+        """A graph-wide numbering of :class:`fea.Halfspace` objects so that a :class:`fea.Node` can be stored as an integer bitmask
+
+        Halfspaces are numbered in the order they are first seen. Equal halfspaces (see :func:`fea.Halfspace.__eq__`) share a number
+
+        Parameters
+        ----------
+        cache_size : int
+            How many of the most recently looked up bitmasks keep their frozenset of halfspaces. Default 4096
+        """
+        self._index={}
+        self._halfspaces=[]
+        # The halfspaces of the most recently looked up bitmasks, least recent first
+        self._members=OrderedDict()
+        self._cache_size=cache_size
+
+    def index(self,halfspace):
+        """The bit number of a halfspace. Registers the halfspace if it is new"""
+        try:
+            return self._index[halfspace]
+        except KeyError:
+            self._index[halfspace]=len(self._halfspaces)
+            self._halfspaces.append(halfspace)
+            return self._index[halfspace]
+
+    def mask(self,halfspaces):
+        """The integer bitmask for an iterable of halfspaces"""
+        m=0
+        for h in halfspaces:
+            m|=1<<self.index(h)
+        return m
+
+    def halfspaces(self,mask):
+        """The frozenset of halfspaces in a bitmask. Only the set bits are visited, and not at all for a bitmask still in the cache"""
+        try:
+            res=self._members[mask]
+            self._members.move_to_end(mask)
+            return res
+        except KeyError:
+            res=[]
+            m=mask
+            while m:
+                low=m&-m
+                res.append(self._halfspaces[low.bit_length()-1])
+                m^=low
+            res=self._members[mask]=frozenset(res)
+            if len(self._members)>self._cache_size:
+                self._members.popitem(last=False)
+            return res
+
+    @property
+    def nbytes(self):
+        """Bytes held by the numbering and the cached members, not counting the halfspaces themselves"""
+        return sys.getsizeof(self._index)+sys.getsizeof(self._halfspaces)+sys.getsizeof(self._members)+sum(sys.getsizeof(m) for m in self._members.values())
+
+    def __len__(self):
+        """Length is the number of registered halfspaces"""
+        return len(self._halfspaces)
+
 class Node(frozenset):
     _id_gen = iter(itertools.count())
 
@@ -26,10 +88,14 @@ class Node(frozenset):
             If defined, specifies the number of dimensions of the problem (necessary only for an empty set where this cannot be found by the facets)
         eps : float
             If defined, the margin of error for this node
+        registry : :class:`fea.HalfspaceRegistry`
+            If defined, the node is also kept as an integer bitmask over this registry. Subset tests and equality between nodes sharing a registry then only compare integers
         """
         self._id=-1
         self._n=kwargs.pop('n',None)
         self._eps=kwargs.pop('eps',None)
+        self._registry=kwargs.pop('registry',None)
+        self._mask=kwargs.pop('_mask',None)
         self._graph=None
         super().__init__()
 
@@ -48,6 +114,13 @@ class Node(frozenset):
             return self._graph.node[self].get('complete',False)
         return False
 
+    @property
+    def _stats(self):
+        """Private. The :class:`fea.Stats` of the graph holding this node, or None"""
+        if self._graph is not None:
+            return self._graph.stats
+        return None
+
 
     @property
     def id(self):
@@ -57,6 +130,29 @@ class Node(frozenset):
             self._id=next(Node._id_gen)
         return self._id
 
+    @property
+    def mask(self):
+        """Integer bitmask of the halfspaces in this node, or None without a registry"""
+        if self._mask is None and self._registry is not None:
+            self._mask=self._registry.mask(self)
+        return self._mask
+
+    def _shares_registry(self,other):
+        """Private. Whether both nodes are bitmasks over the same registry"""
+        return self._registry is not None and isinstance(other,Node) and other._registry is self._registry
+
+    @classmethod
+    def _from_mask(cls,registry,mask,n,eps,members=None):
+        """Private. Build a node from a bitmask, and its frozenset of halfspaces if already known. Otherwise the registry builds that from the set bits unless it has them cached"""
+        node=frozenset.__new__(cls,registry.halfspaces(mask) if members is None else members)
+        node._id=-1
+        node._n=n
+        node._eps=eps
+        node._registry=registry
+        node._mask=mask
+        node._graph=None
+        return node
+
     @property
     def n(self):
         """The max norm of of the halfspace, indicates level"""
@@ -109,11 +205,10 @@ class Node(frozenset):
                 else:
                     return []
             else:
-                log.info('Finding Common Point for '+repr(self))
                 lst=[h for h in self if h.real]
                 A=[h.norm for h in lst]
                 b=[h.rhs for h in lst]
-                self._point=lstsq(A,b,self.eps)
+                self._point=lstsq(A,b,self.eps,stats=self._stats)
             return self._point
 
 
@@ -222,7 +317,7 @@ class Node(frozenset):
         # Solve for the vector
         if log.getEffectiveLevel()<=10:
             log.info('Solving for orthoganol vector for '+repr(self))
-        r=lstsq(a,b,self.eps)
+        r=lstsq(a,b,self.eps,stats=self._stats)
 
         # Make sure it is not pointing towards any of the children we didn't previously utilize
         for c in children[nchild:]:
@@ -238,15 +333,57 @@ class Node(frozenset):
         r=np.random.rand(self.n)-.5
         return r/np.linalg.norm(r)
 
-    # Cast super to node for frozenset operators
+    # Cast super to node for frozenset operators. With a shared registry the result's bitmask takes one integer operation, so it needs
+    # no registry lookups later, but the frozenset operation still runs: these cost as much as without a registry. Only the comparisons below are integer operations alone
     def __and__(self,other):
-        return Node(super().__and__(other),n=self.n,eps=self._eps)
+        if self._shares_registry(other):
+            return Node._from_mask(self._registry,self.mask&other.mask,self.n,self._eps,super().__and__(other))
+        return Node(super().__and__(other),n=self.n,eps=self._eps,registry=self._registry)
     def __or__(self,other):
-        return Node(super().__or__(other),n=self.n,eps=self._eps)
+        if self._shares_registry(other):
+            return Node._from_mask(self._registry,self.mask|other.mask,self.n,self._eps,super().__or__(other))
+        return Node(super().__or__(other),n=self.n,eps=self._eps,registry=self._registry)
     def __xor__(self,other):
-        return Node(super().__xor__(other),n=self.n,eps=self._eps)
+        if self._shares_registry(other):
+            return Node._from_mask(self._registry,self.mask^other.mask,self.n,self._eps,super().__xor__(other))
+        return Node(super().__xor__(other),n=self.n,eps=self._eps,registry=self._registry)
     def __sub__(self,other):
-        return Node(super().__sub__(other),n=self.n,eps=self._eps)
+        if self._shares_registry(other):
+            return Node._from_mask(self._registry,self.mask&~other.mask,self.n,self._eps,super().__sub__(other))
+        return Node(super().__sub__(other),n=self.n,eps=self._eps,registry=self._registry)
+
+    # Bitmask comparisons. Hashing stays the frozenset hash (cached by python) so mixed nodes still match
+    def __eq__(self,other):
+        if self is other:
+            return True
+        if self._shares_registry(other):
+            return self.mask==other.mask
+        return super().__eq__(other)
+    def __ne__(self,other):
+        if self._shares_registry(other):
+            return self.mask!=other.mask
+        return super().__ne__(other)
+    def __le__(self,other):
+        if self._shares_registry(other):
+            m=self.mask
+            return m&other.mask==m
+        return super().__le__(other)
+    def __lt__(self,other):
+        if self._shares_registry(other):
+            m,o=self.mask,other.mask
+            return m!=o and m&o==m
+        return super().__lt__(other)
+    def __ge__(self,other):
+        if self._shares_registry(other):
+            o=other.mask
+            return self.mask&o==o
+        return super().__ge__(other)
+    def __gt__(self,other):
+        if self._shares_registry(other):
+            m,o=self.mask,other.mask
+            return m!=o and m&o==o
+        return super().__gt__(other)
+    __hash__=frozenset.__hash__
 
     # Utility Functions
     def __str__(self):
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+import logging
+log=logging.getLogger('fea.scipy')
+
+import numpy as np
+from .Search import Search
+
+class ScipySearch(Search):
+    def __init__(self,model,vars,eps=10**-6,clone=True,persistent=False,stats=None):
+        """
+        An FEA searcher which solves with :func:`scipy.optimize.linprog` (HiGHS) instead of going through optlang
+
+        The model is read once into sparse matrices. Each search appends the halfspaces as dense equality rows and reads the duals straight from the result. The model itself is never changed
+
+        Parameters
+        ----------
+        model : :class:`optlang.Model`
+            The model to solve
+        vars : iterable
+            A list of target variables contained in the model
+        eps : float
+            Detection limit. Default 1E-6
+        clone : bool
+            Ignored, the model is only read
+        persistent : bool
+            Ignored, there are no solver rows to keep
+        stats : :class:`fea.Stats`
+            Where to count LP solves and lstsq calls. Defaults to a new one
+        """
+        from scipy import sparse
+        from scipy.optimize import linprog
+        self._sparse=sparse
+        self._linprog=linprog
+
+        super().__init__(model,vars,eps=eps,clone=False,stats=stats)
+
+        # Columns
+        columns={v.name:i for i,v in enumerate(self.m.variables)}
+        self._columns=len(columns)
+        self._bounds=[(v.lb,v.ub) for v in self.m.variables]
+        self._split_columns=np.array([columns[name] for name in self._split_names],dtype=int)
+
+        # Rows, split into equalities (A_eq x = b_eq) and upper bounds (A_ub x <= b_ub)
+        eq,ub=([],[],[],[]),([],[],[],[])
+        for c in self.m.constraints:
+            coefs=c.get_linear_coefficients(c.variables)
+            if c.lb is not None and c.ub is not None and c.lb==c.ub:
+                targets=[(eq,1,c.ub)]
+            else:
+                targets=[]
+                if c.ub is not None:
+                    targets.append((ub,1,c.ub))
+                if c.lb is not None:
+                    targets.append((ub,-1,-c.lb))
+            for (rows,cols,vals,b),sign,rhs in targets:
+                for v,a in coefs.items():
+                    rows.append(len(b))
+                    cols.append(columns[v.name])
+                    vals.append(sign*a)
+                b.append(rhs)
+        self._A_eq,self._b_eq=self._csr(eq)
+        self._A_ub,self._b_ub=self._csr(ub)
+
+        # Halfspace right-hand sides (including eps) for the current search
+        self._rhs=None
+        # linprog options, with the time limit of the current LP
+        self._options={}
+
+    def _csr(self,triplets):
+        """Private. Build a CSR matrix and right-hand side from row, column, value and rhs lists"""
+        rows,cols,vals,b=triplets
+        return self._sparse.csr_matrix((vals,(rows,cols)),shape=(len(b),self._columns)),np.array(b,dtype=float)
+
+    def _dense(self,vector):
+        """Private. Spread a vector over the target variables onto all model columns"""
+        res=np.zeros(self._columns)
+        np.add.at(res,self._split_columns,self._split_sign*np.asarray(vector)[self._split_owner])
+        return res
+
+    def deactivate(self):
+        """Nothing to remove, the model is never changed"""
+        pass
+
+    def set(self,obj,hps):
+        """Set the current search
+
+        Parameters
+        ----------
+        obj: :class:`numpy.ndarray`
+            The objective function vector
+        hps: iterable of :class:`fea.Halfspace`
+            List of Halfspaces to use as the current solution
+        """
+        self.H=list(hps)
+        self.O=obj/np.linalg.norm(obj)
+        self._rhs=np.array([h.rhs+self.eps for h in self.H],dtype=float)
+
+    def Heps(self,i=None):
+        """
+        Halfspace epsilon values
+
+        Parameters
+        ----------
+        i: int
+            Optional index of which halfspace to get the epsilon from. Defaults to all
+
+        Returns
+        -------
+            Halfspace epsilon values
+        """
+        eps=self._rhs-np.array([h.rhs for h in self.H])
+        if i is not None:
+            return eps[i]
+        return eps
+
+    def get_solution(self,_i=0):
+        """
+        Attempt to solve the currently set problem
+
+        Returns
+        -------
+        Boolean indicating whether it was able to find an optimal solution. If not, timed_out tells whether it ran out of time or LPs
+        """
+        if not self._start_lp(_i):
+            return False
+        k=len(self.H)
+        A_eq,b_eq=self._A_eq,self._b_eq
+        if k>0:
+            A_eq=self._sparse.vstack([A_eq,self._sparse.csr_matrix(np.array([self._dense(h.norm) for h in self.H]))],format='csr')
+            b_eq=np.append(b_eq,self._rhs)
+
+        # linprog minimizes, so flip the objective
+        with self.stats.timer('lp'):
+            self._result=self._linprog(-self._dense(self.O),
+                A_ub=self._A_ub if len(self._b_ub) else None,b_ub=self._b_ub if len(self._b_ub) else None,
+                A_eq=A_eq if len(b_eq) else None,b_eq=b_eq if len(b_eq) else None,
+                bounds=self._bounds,method='highs',options=self._options)
+
+        if self.sink is not None:
+            self.sink.emit('lp',trace=self.trace,status='optimal' if self._result.status==0 else self._result.message,attempt=_i)
+        if self._result.status==1:
+            # Iteration or time limit
+            return self._out_of_time()
+        if self._result.status!=0:
+            if _i<self._max_iterations and k>0:
+                self.stats.count('lp_retries')
+                self.perturb_cons()
+                return self.get_solution(_i+1)
+            else:
+                self.stats.count('lp_failures')
+                return False
+        self.snapshot()
+        return True
+
+    def _set_time_limit(self,limit):
+        """Private. Set the HiGHS time limit in seconds (None for unlimited)"""
+        self._options={} if limit is None else {'time_limit':limit}
+        self._time_limit=limit
+
+    def snapshot(self):
+        """
+        Read the values of the current solution
+
+        Same as :func:`fea.Search.snapshot`, but straight from the :func:`scipy.optimize.linprog` result. Its duals are for the flipped (minimized) objective
+        """
+        res=self._result
+        x=res.x[self._split_columns]
+        d=-(res.lower.marginals+res.upper.marginals)[self._split_columns]
+        self._vp=np.bincount(self._split_owner,weights=self._split_sign*x,minlength=self.n)
+        self._vd=np.bincount(self._split_owner,weights=self._split_sign*d,minlength=self.n)
+
+        k=len(self.H)
+        self._Hd=-res.eqlin.marginals[len(self._b_eq):] if k>0 else np.zeros(0)
+        self._Hrhs=np.copy(self._rhs)
+        self._objective_value=-res.fun
+
+    def perturb_cons(self,index=None):
+        """
+        Randomly perturb one halfspace constraint to find a new solution
+        """
+        if index is None:
+            index=np.random.randint(len(self.H))
+
+        eps=np.random.uniform(high=self.Heps(index))
+        self._rhs[index]=self.H[index].rhs+eps
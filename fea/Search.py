@@ -2,17 +2,21 @@
 import logging
 log=logging.getLogger('fea.search')
 
+import math
+import time
 import numpy as np
-from .Halfspace import Halfspace
-from .util import lstsq
+from .Halfspace import Halfspace, _ol_new_constraints
+from .util import lstsq, lstsq_many, coefficients
+from .Stats import Stats
 from .VWrapper import VWrapper
 
 
 class Search:
     _multiplier=10
     _max_iterations=10
+    _spare_rows=20
 
-    def __init__(self,model,vars,eps=10**-6,clone=True):
+    def __init__(self,model,vars,eps=10**-6,clone=True,persistent=False,stats=None):
         """
         Class for an FEA searcher for finding new halfspaces
 
@@ -28,6 +32,11 @@ class Search:
             Detection limit. Default 1E-6
         clone : bool
             Whether to clone the model or just use the existing one
+        persistent : bool
+            Whether to keep the objective and one constraint row per halfspace in the model between searches, so the solver can warm-start from its previous basis.
+            Rows of halfspaces a search doesn't use are left unbounded, and are removed once more than :attr:`_spare_rows` of them pile up. Default False
+        stats : :class:`fea.Stats`
+            Where to count LP solves and lstsq calls. Defaults to a new one
         """
         self.interface=model.interface
         if clone:
@@ -38,6 +47,11 @@ class Search:
         # Variables
         self.v=[VWrapper(v,self.m) for v in vars]
 
+        # Index maps from the underlying optlang variables to the target variables. Split (forward/reverse) variables give two entries
+        self._split_names=[x.name for v in self.v for x in v.vars]
+        self._split_owner=np.array([i for i,v in enumerate(self.v) for x in v.vars],dtype=int)
+        self._split_sign=np.array([VWrapper._coeff[j] for v in self.v for j in range(len(v.vars))],dtype=float)
+
         # Detection Limit
         self.eps=eps
 
@@ -51,14 +65,44 @@ class Search:
         # Objective
         self.O=None
 
+        # Values of the last optimal solution, see snapshot
+        self._vp=None
+        self._vd=None
+        self._Hd=None
+        self._Hrhs=None
+        self._objective_value=None
+
+        # Reusable constraint rows for persistent mode, and whether the objective is in place
+        self.persistent=persistent
+        self._rows={}
+        self._objective_set=False
+
+        self.stats=stats if stats is not None else Stats()
+        # Trace event sink (see fea.TraceSink) and the trace id of the current search, both set by the graph
+        self.sink=None
+        self.trace=None
+
+        # Seconds each LP may take, the time.monotonic() time by which searches must stop and how many LPs (with retries) a search may take. All set by the graph, None is unlimited
+        self.timeout=None
+        self.deadline=None
+        self.lp_limit=None
+        # Whether the last get_solution ran out of time or LPs, and the time limit currently given to the solver
+        self.timed_out=False
+        self._time_limit=None
+
     def deactivate(self):
         """Remove the current constraint"""
+        if self.persistent:
+            self.m.remove(list(self._rows.values()))
+            self._rows={}
+            self._objective_set=False
+            return
         self.m.remove(self.H_cons)
 
     def activate(self):
         """Add the current constraint"""
-        self.m.add(self.H_cons)
-        self.m.objective=self.interface.Objective(np.dot(self.O,self.vexpr))
+        self.H_cons=_ol_new_constraints(self.H,self.m,self.v,eps=self.eps)
+        self._set_objective()
 
     def set(self,obj,hps):
         """Set the current constraint
@@ -70,32 +114,90 @@ class Search:
         hps: iterable of :class:`fea.Halfspace`
             List of Halfspaces to use as the current solution
         """
+        if self.persistent:
+            self.H=list(hps)
+            self.O=obj/np.linalg.norm(obj)
+            self._load_rows()
+            return
+
         # Deactivate previous constraints
         if self.H_cons is not None:
             self.deactivate()
         
         # Update the search for a new search
         self.H=list(hps)
-        # self.H_cons=[h._ol_new_constraint(self.vexpr,self.interface,eps=self.eps) for h in self.H]
-        self.H_cons=[h._ol_new_constraint(self.m,eps=self.eps) for h in self.H]
         self.O=obj/np.linalg.norm(obj)
 
         # Go ahead and activate the new problem
         self.activate()
     
+    def _load_rows(self):
+        """Private. Load the current halfspaces and objective into the persistent rows
+
+        Each halfspace keeps its own row, so the coefficients of a row never change and the previous basis stays valid.
+        Rows of halfspaces which aren't part of this search are left unbounded, and are only dropped once more than _spare_rows pile up
+        """
+        spare=[h for h in self._rows if h not in self.H]
+        if len(spare)>self._spare_rows:
+            self.m.remove([self._rows.pop(h) for h in spare])
+            spare=[]
+        for h in spare:
+            self._rows[h].ub=None
+            self._rows[h].lb=None
+
+        new=[h for h in self.H if h not in self._rows]
+        self._rows.update(zip(new,_ol_new_constraints(new,self.m,self.v,eps=self.eps)))
+
+        for h in self.H:
+            if h not in new:
+                rhs=h.rhs+self.eps
+                self._rows[h].ub=None
+                self._rows[h].lb=rhs
+                self._rows[h].ub=rhs
+        self.H_cons=[self._rows[h] for h in self.H]
+        self._set_objective()
+
+    def _set_objective(self):
+        """Private. Point the objective along O, straight from its coefficients"""
+        if not self._objective_set:
+            self.m.objective=self.interface.Objective(0)
+            self._objective_set=True
+        self.m.objective.set_linear_coefficients(coefficients(self.O,self.v))
+
     @property
     def vexpr(self):
         """Variable expressions"""
         return [v.expr for v in self.v]
 
+    def snapshot(self):
+        """
+        Read the values of the current solution in bulk
+
+        Primal values and reduced costs of the target variables and the shadow prices and right-hand sides of the current halfspaces are stored as :class:`numpy.ndarray`, along with the objective value.
+        Called after every optimal solve, so :attr:`vp`, :attr:`vd` and :func:`Hd` don't go back to the solver
+        """
+        primals=self.m.primal_values
+        costs=self.m.reduced_costs
+        prices=self.m.shadow_prices
+
+        k=len(self._split_names)
+        p=np.fromiter((primals[name] for name in self._split_names),dtype=float,count=k)
+        d=np.fromiter((costs[name] for name in self._split_names),dtype=float,count=k)
+        self._vp=np.bincount(self._split_owner,weights=self._split_sign*p,minlength=self.n)
+        self._vd=np.bincount(self._split_owner,weights=self._split_sign*d,minlength=self.n)
+
+        self._Hd=np.fromiter((prices[c.name] for c in self.H_cons),dtype=float,count=len(self.H_cons))
+        self._Hrhs=np.fromiter((c.ub for c in self.H_cons),dtype=float,count=len(self.H_cons))
+        self._objective_value=self.m.objective.value
+
     @property
     def vp(self):
         """Variable primal values"""
-        return [v.primal for v in self.v]
+        return self._vp
     @property
     def vd(self):
         """Variable dual values"""
-        return [v.dual for v in self.v]
+        return self._vd
     
     def Hd(self,i=None):
         """
@@ -111,8 +213,8 @@ class Search:
             Halfspace dual values
         """
         if i is not None:
-            return self.H[i]._ol_dual(self.m)
-        return [h._ol_dual(self.m) for h in self.H]
+            return self._Hd[i]
+        return self._Hd
     
     def Heps(self,i=None):
         """
@@ -128,8 +230,8 @@ class Search:
             Halfspace epsilon values
         """
         if i is not None:
-            return self.H[i]._ol_eps(self.m)
-        return [h._ol_eps(self.m) for h in self.H]
+            return self.H_cons[i].ub-self.H[i].rhs
+        return [c.ub-h.rhs for c,h in zip(self.H_cons,self.H)]
 
     def get_solution(self,_i=0):
         """
@@ -137,20 +239,68 @@ class Search:
 
         Returns
         -------
-        Boolean indicating whether it was able to find an optimal solution
+        Boolean indicating whether it was able to find an optimal solution. If not, timed_out tells whether it ran out of time or LPs
         """
-        self.m.optimize()
-
+        if not self._start_lp(_i):
+            return False
+        with self.stats.timer('lp'):
+            self.m.optimize()
+
+        if self.sink is not None:
+            self.sink.emit('lp',trace=self.trace,status=self.m.status,attempt=_i)
+        if self.m.status=='time_limit':
+            return self._out_of_time()
         if self.m.status != 'optimal': # Could also check whether =='infeasible'
-            log.info('Solver returned status of '+self.m.status)
             if _i<self._max_iterations:
+                self.stats.count('lp_retries')
                 self.perturb_cons()
                 return self.get_solution(_i+1)
             else:
+                self.stats.count('lp_failures')
                 return False
-        log.info('Optimal solution obtained at '+str(self.vp))
+        self.snapshot()
         return True
 
+    def _start_lp(self,attempt):
+        """Private. Give the solver what is left of the per-LP timeout and the deadline before an LP
+
+        Returns
+        -------
+        False (after counting a timeout) if there is no time or LP left for the LP
+        """
+        if attempt==0:
+            self.timed_out=False
+        if self.lp_limit is not None and attempt>=self.lp_limit:
+            return self._out_of_time()
+        if self.timeout is None and self.deadline is None:
+            if self._time_limit is not None:
+                self._set_time_limit(None)
+            return True
+
+        limit=self.timeout
+        if self.deadline is not None:
+            left=self.deadline-time.monotonic()
+            limit=left if limit is None else min(limit,left)
+        if limit<=0:
+            return self._out_of_time()
+        self._set_time_limit(limit)
+        return True
+
+    def _out_of_time(self):
+        """Private. Count a search that ran out of time or LPs. Returns False"""
+        self.timed_out=True
+        self.stats.count('lp_timeouts')
+        return False
+
+    def _set_time_limit(self,limit):
+        """Private. Set the solver time limit in seconds (None for unlimited)"""
+        try:
+            self.m.configuration.timeout=limit
+        except TypeError:
+            # GLPK only takes whole seconds
+            self.m.configuration.timeout=int(math.ceil(limit))
+        self._time_limit=limit
+
     # Randomly (unless otherwise specified) shift a halfspace constraint
     def perturb_cons(self,index=None):
         """
@@ -161,10 +311,6 @@ class Search:
             index=np.random.randint(len(self.H))
 
         eps=np.random.uniform(high=self.Heps(index))
-
-        if log.getEffectiveLevel()<=10: # Somewhat expensive logging operation
-            log.info('Changing '+str(self.H[index])+' to have eps='+str(eps))
-
         rhs=self.H[index].rhs+eps
 
         self.H_cons[index].ub=None
@@ -186,45 +332,49 @@ class Search:
         b=[-1]
 
         A1_base=np.array([h.norm for h in self.H]+[self.O])
-        b1_base=np.array([h._ol_rhs(self.m) for h in self.H]+[self.m.objective.value])
+        b1_base=np.append(self._Hrhs,self._objective_value)
 
         # If we don't have enough constraints/duals to fully determine the system!
         if len(b1_base)<self.n-1:
-            log.info('Insufficient Equations')
+            if self.sink is not None:
+                self.sink.emit('bounding',trace=self.trace,result='insufficient_equations')
             return self.psuedo_halfspace()
 
-        # Loop Through Shadow Prices
-        for i,(h,hd) in enumerate(zip(self.H,self.Hd())):
-            log.info('Considering '+str(h)+" ~ "+str(hd))
-            # TODO: We may not want/need this if statement. A basic halfspace still gives information (i.e. it's perpendicular)
-
-            A1=np.copy(A1_base)
-            b1=np.copy(b1_base)
-
-            b1[i]+=self._multiplier
-            b1[-1]+=self._multiplier*hd
+        # Perturb each halfspace in turn along with the objective by its shadow price, and solve for all of them at once
+        hd=self.Hd()
+        k=len(self.H)
+        if k>0:
+            B=np.repeat(b1_base[:,np.newaxis],k,axis=1)
+            B[np.arange(k),np.arange(k)]+=self._multiplier
+            B[-1]+=self._multiplier*hd
 
+            # Perturbations without a valid solution are skipped
             try:
-                newA=lstsq(A1,b1,self.eps)-self.vp
-                A+=[newA]
-                b+=[0]
+                X,ok=lstsq_many(A1_base,B,self.eps,stats=self.stats)
+                for i in range(k):
+                    if ok[i]:
+                        A+=[X[:,i]-self.vp]
+                        b+=[0]
             except ValueError:
-                log.info('LstSq Error.')
+                pass
 
         # If we can't get enough values to fully determine the system! (This step should only occur when facet duals are 0, which they really shouldn't be)
         if len(A)<self.n:
-            log.info('Insufficient Duals')
+            if self.sink is not None:
+                self.sink.emit('bounding',trace=self.trace,result='insufficient_duals')
             return self.psuedo_halfspace()
         # Now, solve for the overall solution
         try:
-            log.info('Solving for bounding facet')
-            nh=Halfspace(self.vexpr,lstsq(A,b,self.eps),self.vp,eps=self.eps,interface=self.interface)
-
+            nh=Halfspace(lstsq(A,b,self.eps,stats=self.stats),self.vp,eps=self.eps)
+            if self.sink is not None:
+                self.sink.emit('bounding',trace=self.trace,result='real')
             return nh
 
         except ValueError:
             # TODO: Could this be orthoganol?
             log.error('Could not find the bounding facet.')
+            if self.sink is not None:
+                self.sink.emit('bounding',trace=self.trace,result='failed')
             return self.psuedo_halfspace()
 
     def psuedo_halfspace(self):
@@ -234,4 +384,4 @@ class Search:
         -------
         :class:`fea.Halfspace` object representing a new psuedo-halfspace
         """
-        return Halfspace(self.vexpr,-self.O,self.vp,real=False,eps=self.eps,interface=self.interface,required=set(self.H))
+        return Halfspace(-self.O,self.vp,real=False,eps=self.eps,required=set(self.H))
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+import logging
+log=logging.getLogger('fea.pool')
+
+import multiprocessing
+
+from .Search import Search
+from .Stats import Stats
+
+# Each worker process holds exactly one searcher, built once by the pool initializer
+_searcher=None
+
+def _init_worker(model,vars,eps,persistent=False,searcher=Search):
+    """Private. Build the searcher for this worker process
+
+    The model arrives pickled, so the worker already holds its own copy and does not need to clone it again
+    """
+    global _searcher
+    _searcher=searcher(model,vars,eps=eps,clone=False,persistent=persistent)
+
+class _Events(list):
+    """Private. Stands in for a :class:`fea.TraceSink` in a worker and keeps the events of one search to send back"""
+    def emit(self,event,**fields):
+        self.append((event,fields))
+
+def _start(trace,record):
+    """Private. Reset the worker searcher's stats and give it the search's trace id, and a list for its events if the pool records them"""
+    _searcher.stats.reset()
+    _searcher.trace=trace
+    _searcher.sink=_Events() if record else None
+
+def _run_search(args):
+    """Private. Run a single search in a worker process
+
+    Returns
+    -------
+    The bounding :class:`fea.Halfspace`, None if the solver failed or False if it ran out of time or LPs, the searcher's stats for this search and its trace events (None unless recorded)
+    """
+    obj,hps,trace,record,_searcher.timeout,_searcher.deadline,_searcher.lp_limit=args
+    _start(trace,record)
+    _searcher.set(obj,hps)
+    if not _searcher.get_solution():
+        return (False if _searcher.timed_out else None),_searcher.stats.as_dict(),_searcher.sink
+    return _searcher.bounding_halfspace(),_searcher.stats.as_dict(),_searcher.sink
+
+def _run_point(args):
+    """Private. Solve a single search in a worker process and return only its optimal point
+
+    Returns
+    -------
+    The optimal point as a :class:`numpy.ndarray` or None if the solver failed, the searcher's stats for this search and its trace events (None unless recorded)
+    """
+    obj,hps,trace,record=args
+    _searcher.timeout=_searcher.deadline=_searcher.lp_limit=None
+    _start(trace,record)
+    _searcher.set(obj,hps)
+    if not _searcher.get_solution():
+        return None,_searcher.stats.as_dict(),_searcher.sink
+    return _searcher.vp,_searcher.stats.as_dict(),_searcher.sink
+
+class SearchPool:
+    def __init__(self,model,vars,processes=None,eps=10**-6,persistent=False,searcher=Search,stats=None):
+        """
+        A pool of :class:`fea.Search` workers, each running in its own process with its own copy of the model
+
+        Parameters
+        ----------
+        model : :class:`optlang.Model`
+            The model to solve
+        vars : iterable
+            A list of target variables contained in the model
+        processes : int
+            Number of worker processes. Defaults to the number of CPUs
+        eps : float
+            Detection limit. Default 1E-6
+        persistent : bool
+            Whether the searchers keep persistent constraint rows (see :class:`fea.Search`). Default False
+        searcher : class
+            The searcher class to run in each worker, :class:`fea.Search` or :class:`fea.ScipySearch`. Default :class:`fea.Search`
+        stats : :class:`fea.Stats`
+            Where to add up the LP solves and lstsq calls of all workers. Defaults to a new one
+        """
+        if processes is None:
+            processes=multiprocessing.cpu_count()
+        self.processes=processes
+        self.eps=eps
+        self.stats=stats if stats is not None else Stats()
+        # Trace event sink (see fea.TraceSink), set by the graph. The workers' lp and bounding events are written to it as their results come back
+        self.sink=None
+        # Per-LP timeout, time.monotonic() deadline and LP limit sent along with every search, see fea.Search
+        self.timeout=None
+        self.deadline=None
+        self.lp_limit=None
+
+        log.info('Starting '+str(processes)+' searchers')
+        self._pool=multiprocessing.Pool(processes,initializer=_init_worker,initargs=(model,list(vars),eps,persistent,searcher))
+
+    def map(self,searches,traces=None):
+        """
+        Run several searches at once
+
+        Parameters
+        ----------
+        searches: iterable
+            Tuples of (objective vector, iterable of :class:`fea.Halfspace`) as would be given to :func:`fea.Search.set`
+        traces: iterable
+            The trace id of each search, for its events. Default None for all
+
+        Returns
+        -------
+        A list with the bounding :class:`fea.Halfspace` for each search, None where the solver failed or False where it ran out of time or LPs
+        """
+        searches=list(searches)
+        traces=[None]*len(searches) if traces is None else traces
+        record=self.sink is not None
+        return self._collect(self._pool.map(_run_search,[(obj,list(hps),trace,record,self.timeout,self.deadline,self.lp_limit) for (obj,hps),trace in zip(searches,traces)],chunksize=1))
+
+    def points(self,searches,trace=None):
+        """
+        Solve several searches at once without looking for bounding halfspaces
+
+        Parameters
+        ----------
+        searches: iterable
+            Tuples of (objective vector, iterable of :class:`fea.Halfspace`) as would be given to :func:`fea.Search.set`
+        trace: int
+            The trace id for the events of all of them. Default None
+
+        Returns
+        -------
+        A list with the optimal point for each search, or None where the solver failed
+        """
+        record=self.sink is not None
+        return self._collect(self._pool.map(_run_point,[(obj,list(hps),trace,record) for obj,hps in searches],chunksize=1))
+
+    def _collect(self,results):
+        """Private. Add up the stats sent back by the workers, write their events to the sink in search order and return just the results"""
+        for res,stats,events in results:
+            self.stats.update(stats)
+            if events and self.sink is not None:
+                for event,fields in events:
+                    self.sink.emit(event,**fields)
+        return [res for res,stats,events in results]
+
+    def close(self):
+        """Shut down the worker processes"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool=None
+
+    def __len__(self):
+        """Length is the number of worker processes"""
+        return self.processes
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+import time
+from contextlib import contextmanager
+
+class Stats:
+    def __init__(self):
+        """
+        Counters and timers for a :class:`fea.LatticeGraph` solve
+
+        Counts and times are kept by name, and a timed block counts once each time it runs. A graph and its searchers share one Stats object, and searchers in a :class:`fea.SearchPool` send theirs back with every result
+
+        Names in use are:
+
+        * lp, lp_retries, lp_failures: LP solves (with their time), solves repeated after perturbing a halfspace, and searches given up on
+        * lp_timeouts: searches stopped by the per-LP timeout, time budget or LP budget of :func:`fea.LatticeGraph.solve`
+        * lstsq: least squares solves in the searchers and for nodes in the graph (with their time)
+        * real_halfspaces, pseudo_halfspaces: halfspaces found by searches
+        * add_node, remove_node: graph changes, including the ones they cause
+        * completeness: updates of the graph completeness (with their time)
+        * solve: calls to :func:`fea.LatticeGraph.solve` (with their time)
+        * presolve, presolve_variables, presolve_constraints: the presolve of the problem (with its time), and the variables and constraints it removed
+        * nullspace: the null space rewrite of the problem (with its time)
+
+        The queue length before every batch of searches is kept in queue_lengths
+        """
+        self.reset()
+
+    def reset(self):
+        """Set everything back to zero"""
+        self.counts={}
+        self.times={}
+        self.queue_lengths=[]
+
+    def count(self,name,n=1):
+        """Add n to a counter"""
+        self.counts[name]=self.counts.get(name,0)+n
+
+    @contextmanager
+    def timer(self,name):
+        """Count and time a block of code under a name"""
+        start=time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name]=self.times.get(name,0.0)+time.perf_counter()-start
+            self.counts[name]=self.counts.get(name,0)+1
+
+    def update(self,other):
+        """Add the counts and times of another Stats object or of the dictionary from :func:`as_dict`"""
+        if isinstance(other,Stats):
+            other=other.as_dict()
+        for name,n in other['counts'].items():
+            self.count(name,n)
+        for name,t in other['times'].items():
+            self.times[name]=self.times.get(name,0.0)+t
+        self.queue_lengths.extend(other.get('queue_lengths',[]))
+
+    def as_dict(self):
+        """The counts, times and queue lengths as plain dictionaries and lists"""
+        return {'counts':dict(self.counts),'times':dict(self.times),'queue_lengths':list(self.queue_lengths)}
+
+    def __getitem__(self,name):
+        """The count for a name, zero if it never happened"""
+        return self.counts.get(name,0)
+
+    def __str__(self):
+        """Table of every count, with the total and mean time where there is one"""
+        rows=['{:<20}{:>10}{:>12}{:>12}'.format('','count','time (s)','mean (ms)')]
+        for name in sorted(self.counts):
+            if name in self.times:
+                n=self.counts[name]
+                rows.append('{:<20}{:>10}{:>12.4f}{:>12.4f}'.format(name,n,self.times[name],1000*self.times[name]/max(n,1)))
+            else:
+                rows.append('{:<20}{:>10}'.format(name,self.counts[name]))
+        if self.queue_lengths:
+            rows.append('{:<20}{:>10}'.format('max queue',max(self.queue_lengths)))
+        return '\n'.join(rows)
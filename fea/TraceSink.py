@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+import json
+
+import numpy as np
+from networkx import DiGraph
+
+class TraceSink:
+    def __init__(self,path):
+        """
+        A JSON lines file of trace events from a :class:`fea.LatticeGraph` solve
+
+        Attach one with the sink argument of :class:`fea.LatticeGraph` (or set its sink attribute). Without a sink no events are built at all.
+        Every line is one event with an 'event' name and its fields. Halfspaces and nodes are referred to by id, and each halfspace is written out once, before the first node using it:
+
+        * halfspace: id, norm, point, real, eps, required
+        * node_added: id, halfspaces, level, trace
+        * node_removed: id
+        * node_complete: id, complete
+        * edge_added: from, to, trace
+        * search: node, trace, direction
+        * lp: trace, status, attempt (0 unless retried after perturbing a halfspace)
+        * bounding: trace, result ('real', or why a pseudo halfspace was used instead: 'insufficient_equations', 'insufficient_duals' or 'failed')
+        * facet_found: node, halfspace, trace, result ('added', 'existing' or 'stale') and the child node for 'added'
+
+        The trace of lp and bounding events is that of the search they belong to. With a :class:`fea.SearchPool` the workers' events are written once their searches come back
+
+        Parameters
+        ----------
+        path : str or file
+            Where to write the events. A file name is opened (and truncated) and closed again by :func:`close`
+        """
+        if isinstance(path,str):
+            self._file=open(path,'w')
+            self._owns_file=True
+        else:
+            self._file=path
+            self._owns_file=False
+        self._halfspaces=set()
+
+    def emit(self,event,**fields):
+        """Write one event"""
+        fields['event']=event
+        self._file.write(json.dumps(fields,separators=(',',':'),default=_plain)+'\n')
+
+    def halfspace(self,halfspace):
+        """Write a halfspace (and the halfspaces it requires) unless it was written before"""
+        if halfspace.id in self._halfspaces:
+            return
+        self._halfspaces.add(halfspace.id)
+        for h in halfspace.required_halfspaces:
+            self.halfspace(h)
+        self.emit('halfspace',id=halfspace.id,norm=halfspace.norm,point=halfspace.point,real=halfspace.real,eps=halfspace.eps,
+            required=sorted(h.id for h in halfspace.required_halfspaces))
+
+    def node(self,event,node,**fields):
+        """Write a node event, with any halfspaces of the node not written before"""
+        for h in node:
+            self.halfspace(h)
+        self.emit(event,id=node.id,halfspaces=sorted(h.id for h in node),**fields)
+
+    def close(self):
+        """Flush the events, and close the file if it was opened here"""
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc):
+        self.close()
+        return False
+
+    @staticmethod
+    def read(path):
+        """
+        Read the events back
+
+        Yields
+        ------
+        Each event as a dictionary, in the order they were written
+        """
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    @classmethod
+    def replay(cls,path,until=None):
+        """
+        Rebuild the lattice from the events
+
+        Parameters
+        ----------
+        path : str
+            The events file
+        until : int
+            Only replay the first until events. Defaults to all of them
+
+        Returns
+        -------
+        A :class:`networkx.DiGraph` on node ids, with the halfspace ids, level, trace and complete flag of every node and the trace (and searched trace) of every edge.
+        The halfspaces are in graph.graph['halfspaces'] by id
+        """
+        g=DiGraph()
+        g.graph['halfspaces']={}
+        for i,e in enumerate(cls.read(path)):
+            if until is not None and i>=until:
+                break
+            event=e['event']
+            if event=='halfspace':
+                g.graph['halfspaces'][e['id']]={k:e[k] for k in ('norm','point','real','eps','required')}
+            elif event=='node_added':
+                g.add_node(e['id'],halfspaces=frozenset(e['halfspaces']),level=e['level'],trace=e['trace'],complete=False)
+            elif event=='node_removed':
+                if e['id'] in g:
+                    g.remove_node(e['id'])
+            elif event=='node_complete':
+                if e['id'] in g:
+                    g.node[e['id']]['complete']=e['complete']
+            elif event=='edge_added':
+                g.add_edge(e['from'],e['to'],trace=e['trace'])
+            elif event=='facet_found' and e['result']=='added':
+                if g.has_edge(e['node'],e['child']):
+                    g.edge[e['node']][e['child']]['searched']=e['trace']
+        return g
+
+def _plain(value):
+    """Private. Turn numpy values into plain JSON types"""
+    if isinstance(value,np.ndarray):
+        return value.tolist()
+    if isinstance(value,np.generic):
+        return value.item()
+    raise TypeError(repr(value)+' is not JSON serializable')
@@ -76,5 +76,14 @@ class VWrapper:
         else:
             self.vars[0].lb=val
 
+    def set_bounds(self,lb,ub):
+        """Set both bounds, in whichever order keeps lb<=ub on the way"""
+        if lb is not None and self.ub is not None and lb>self.ub:
+            self.ub=ub
+            self.lb=lb
+        else:
+            self.lb=lb
+            self.ub=ub
+
     def __str__(self):
         return str(self.name)
\ No newline at end of file
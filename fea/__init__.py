@@ -1,18 +1,30 @@
 
-from .LatticeGraph import LatticeGraph
-from .Node import Node
+from .LatticeGraph import LatticeGraph, SolveEvent
+from .Node import Node, HalfspaceRegistry
 from .Halfspace import Halfspace
 from .Search import Search
+from .ScipySearch import ScipySearch
+from .SearchPool import SearchPool
+from .AsyncPool import AsyncPool
+from .Stats import Stats
+from .TraceSink import TraceSink
 
+from .VWrapper import VWrapper
+from .presolve import presolve
+from .nullspace import reparametrize
+
+import atexit
 import traceback
 import logging
+import pickle
+import multiprocessing
 __log=logging.getLogger('fea.core')
 
 """
 This module contains the flux_envelople_analysis caller function, which will generate a lattice graph of reduced dimensions for a linear optimization problem.
 """
 
-def flux_envelope_analysis(model,variables,max_value=1000,max_iter=1000,eps=10**-4):
+def flux_envelope_analysis(model,variables,max_value=1000,max_iter=1000,eps=10**-4,processes=1,bitset=False,persistent=False,backend='optlang',prior=None,sink=None,time_budget=None,lp_budget=None,lp_timeout=None,presolve=False,nullspace=False):
     """Run Flux Envelope Analysis on a model for the given variables
 
     Parameters
@@ -27,6 +39,28 @@ def flux_envelope_analysis(model,variables,max_value=1000,max_iter=1000,eps=10**
             Maximum number of optimization step iterations
         eps : float
             Detection limit. Default 1E-4
+        processes : positive integer
+            Number of searcher processes to run in parallel. None uses one per CPU. Default 1
+        bitset : bool
+            Whether to keep lattice nodes as integer bitmasks (faster subset tests for large lattices). Default False
+        persistent : bool
+            Whether searchers keep one constraint row per halfspace between searches so the solver can warm-start, removing unused rows once too many pile up (see :class:`fea.Search`). Default False
+        backend : str
+            LP backend for the searchers. 'optlang' solves through the model's own solver, 'scipy' reads the model once into sparse matrices and solves with HiGHS via scipy.optimize.linprog (needs scipy>=1.7). Default 'optlang'
+        prior : fea.LatticeGraph
+            A previous solution for the same variables, e.g. before a small change to the model. Facets which still hold are verified with one LP each and seeded with the vertices between them, so only the changed parts are searched again. Default None
+        sink : fea.TraceSink
+            Where to write a structured trace of the search (nodes, edges, searches, facets found). Default None
+        time_budget : float
+            Seconds of wall-clock time to stop the search after. Default None, unlimited
+        lp_budget : positive integer
+            Number of LP solves to stop the search after. Default None, unlimited
+        lp_timeout : float
+            Seconds any single LP may take. Default None, unlimited
+        presolve : bool
+            Whether to shrink the model (fixed variables, empty, redundant and parallel constraints) before the search, keeping its projection onto the variables. Default False
+        nullspace : bool
+            Whether to rewrite the model over the null space of its equality rows (after any presolve), so every LP has fewer variables and no equality rows. Default False
 
     Returns
     -------
@@ -37,11 +71,218 @@ def flux_envelope_analysis(model,variables,max_value=1000,max_iter=1000,eps=10**
     ------
     This routine will attempt to find a complete solution, but does not guarantee that
     the solution returned will be complete. Always check the 'complete' attribute of the
-    solution before utilizing.
+    solution before utilizing. An incomplete solution (e.g. stopped by a budget) still gives
+    its 'remaining' estimate and its inner and outer approximations.
 
     """
-    obj=LatticeGraph(model,variables,max_value=max_value,eps=eps)
-    res=obj.solve(max_iter)
+    obj=LatticeGraph(model,variables,max_value=max_value,eps=eps,processes=processes,bitset=bitset,persistent=persistent,backend=backend,prior=prior,sink=sink,presolve=presolve,nullspace=nullspace)
+    try:
+        res=obj.solve(max_iter,time_budget=time_budget,lp_budget=lp_budget,lp_timeout=lp_timeout)
+    finally:
+        obj.close()
     return obj
 
-__exports__=[flux_envelope_analysis]
\ No newline at end of file
+# Shared by calls to solve_async without a pool, started on first use
+_async_pool=None
+
+@atexit.register
+def _close_async_pool():
+    """Private. Shut down the shared pool of solve_async when the interpreter exits"""
+    global _async_pool
+    if _async_pool is not None:
+        _async_pool.close()
+        _async_pool=None
+
+async def solve_async(model,variables,pool=None,**kwargs):
+    """Run Flux Envelope Analysis from asyncio without blocking the event loop
+
+    Parameters
+    ----------
+        model : Optlang.Model,
+            The original linear program to be reduced
+        variables : iterable
+            A list of target variables contained in the model
+        pool : fea.AsyncPool
+            The worker processes to solve in, which also bounds how many jobs solve at once. Defaults to one shared pool with a worker per CPU, which is shut down when the interpreter exits
+        kwargs :
+            max_value, max_iter, eps, bitset, persistent, backend, prior, time_budget, lp_budget, lp_timeout, presolve and nullspace as for :func:`flux_envelope_analysis`
+
+    Returns
+    -------
+        solution : fea.LatticeGraph
+            The FEA solution
+
+    Notes
+    ------
+    Cancelling the awaiting task stops the job before its next search (see :class:`fea.AsyncPool`).
+    As with :func:`flux_envelope_analysis`, always check the 'complete' attribute of the solution before utilizing.
+
+    Example
+    -------
+        reduced = await asyncio.wait_for(solve_async(model, variables), timeout=30)
+    """
+    global _async_pool
+    if pool is None:
+        if _async_pool is None:
+            _async_pool=AsyncPool()
+        pool=_async_pool
+    return await pool.solve(model,variables,**kwargs)
+
+# Each batch worker process holds one copy of the model for all of its combinations
+_worker_model=None
+
+def _init_many_worker(model):
+    """Private. Store this worker's copy of the model (it arrives pickled, so it already is a clone)"""
+    global _worker_model
+    _worker_model=model
+
+def _solve_many(args):
+    """Private. Solve one combination on this worker's model and return the pickled solution"""
+    index,variables,max_value,max_iter,eps=args
+
+    # Solving happens in place, so put the bounds back for the next combination afterwards
+    bounds=[(v,v.lb,v.ub) for w in variables for v in VWrapper(w,_worker_model).vars]
+    obj=LatticeGraph(_worker_model,variables,max_value=max_value,eps=eps,clone=False)
+    try:
+        obj.solve(max_iter)
+        return index,pickle.dumps(obj)
+    finally:
+        obj.close()
+        for v,lb,ub in bounds:
+            v.set_bounds(lb,ub)
+
+def flux_envelope_analysis_many(model,combos,workers=None,max_value=1000,max_iter=1000,eps=10**-4):
+    """Run Flux Envelope Analysis on a model for many combinations of variables
+
+    The model is cloned once per worker process and the combinations are spread across the workers
+
+    Parameters
+    ----------
+        model : Optlang.Model,
+            The original linear program to be reduced
+        combos : iterable
+            An iterable of variable lists, each of which is reduced as in :func:`flux_envelope_analysis`
+        workers : positive integer
+            Number of worker processes. Defaults to the number of CPUs
+        max_value : positive number
+            Maximum/Minimum Value for each variable (-max_value<=variable<=max_value). Will be applied to all variables with bounds greater than limit. Default 1000.
+        max_iter : positive integer
+            Maximum number of optimization step iterations
+        eps : float
+            Detection limit. Default 1E-4
+
+    Yields
+    -------
+        combo, solution : tuple
+            The combination as given and its fea.LatticeGraph solution, in the order they finish
+
+    Notes
+    ------
+    As with :func:`flux_envelope_analysis`, always check the 'complete' attribute of each solution before utilizing.
+
+    Example
+    -------
+        for combo, reduced in flux_envelope_analysis_many(model, combinations(variables, 2)):
+            print([v.name for v in combo], reduced.complete)
+    """
+    # Only ship the OptLang model and the variables (never a whole Cameo/CobraPy model) to the workers
+    problem=getattr(model,'solver',model)
+    combos=list(combos)
+    tasks=[(i,[VWrapper(v,problem) for v in combo],max_value,max_iter,eps) for i,combo in enumerate(combos)]
+
+    if workers is None:
+        workers=multiprocessing.cpu_count()
+    workers=max(1,min(workers,len(combos)))
+
+    with multiprocessing.Pool(workers,initializer=_init_many_worker,initargs=(problem,)) as pool:
+        for index,res in pool.imap_unordered(_solve_many,tasks):
+            yield combos[index],pickle.loads(res)
+
+def _sweep_steps(problem,variables,parameter,values,max_value,max_iter,eps):
+    """Private. Solve each value in turn on one model, changing the parameter in place and warm-starting every step from the one before
+
+    Every step is a new LatticeGraph on the model, seeded from the one before and taking over its searcher. Each solution then keeps a clone of the model as it was for its step"""
+    parameter=VWrapper(parameter,problem)
+    prior=searcher=None
+    res=[]
+    for value in values:
+        try:
+            lb,ub=value
+        except TypeError:
+            lb=ub=value
+        parameter.set_bounds(lb,ub)
+
+        obj=LatticeGraph(problem,variables,max_value=max_value,eps=eps,clone=False,prior=prior,searcher=searcher)
+        try:
+            obj.solve(max_iter)
+        finally:
+            searcher=obj._hand_over()
+        res.append(obj)
+        prior=obj
+    return res
+
+def _sweep_many(args):
+    """Private. Sweep one run of consecutive values on this worker's model and return the pickled solutions"""
+    index,values,variables,parameter,max_value,max_iter,eps=args
+    return index,[pickle.dumps(obj) for obj in _sweep_steps(_worker_model,variables,parameter,values,max_value,max_iter,eps)]
+
+def sweep(model,variables,parameter,values,workers=1,max_value=1000,max_iter=1000,eps=10**-4):
+    """Run Flux Envelope Analysis on a model for a series of bounds on one parameter, e.g. for a phenotypic phase plane series
+
+    The model is cloned once and the parameter bounds are changed in place. Each step is a new lattice graph seeded from the facets and vertices of the step before (see the prior argument of :class:`fea.LatticeGraph`),
+    and the one searcher on the clone carries over from step to step. Each solution keeps a clone of the model as it was for its step, so it can be solved further or exported on its own
+
+    Parameters
+    ----------
+        model : Optlang.Model,
+            The original linear program to be reduced
+        variables : iterable
+            The variables to reduce to, as in :func:`flux_envelope_analysis`
+        parameter : Optlang.Variable
+            The variable (or Cameo/CobraPy reaction) whose bounds are swept
+        values : iterable
+            The bounds for each step. Either a number to fix the parameter to, or an (lb, ub) tuple
+        workers : positive integer
+            Number of worker processes. Values above 1 split the values into consecutive runs, one model clone per worker, and only warm-start within each run. Default 1
+        max_value : positive number
+            Maximum/Minimum Value for each variable (-max_value<=variable<=max_value). Will be applied to all variables with bounds greater than limit. Default 1000.
+        max_iter : positive integer
+            Maximum number of optimization step iterations per step
+        eps : float
+            Detection limit. Default 1E-4
+
+    Returns
+    -------
+        A list with the fea.LatticeGraph solution for each value, in the order of values
+
+    Notes
+    ------
+    As with :func:`flux_envelope_analysis`, always check the 'complete' attribute of each solution before utilizing.
+
+    Example
+    -------
+        for o2, reduced in zip(uptakes, sweep(model, [growth, ethanol], oxygen, uptakes)):
+            print(o2, reduced.f_vector)
+    """
+    problem=getattr(model,'solver',model)
+    values=list(values)
+    variables=[VWrapper(v,problem) for v in variables]
+    parameter=VWrapper(parameter,problem)
+
+    if workers is None:
+        workers=multiprocessing.cpu_count()
+    workers=max(1,min(workers,len(values)))
+
+    if workers==1:
+        return _sweep_steps(problem.interface.Model.clone(problem),variables,parameter,values,max_value,max_iter,eps)
+
+    # Consecutive runs, so most steps still start from a close neighbour
+    bounds=[len(values)*i//workers for i in range(workers+1)]
+    tasks=[(bounds[i],values[bounds[i]:bounds[i+1]],variables,parameter,max_value,max_iter,eps) for i in range(workers)]
+    res=[None]*len(values)
+    with multiprocessing.Pool(workers,initializer=_init_many_worker,initargs=(problem,)) as pool:
+        for index,objs in pool.imap_unordered(_sweep_many,tasks):
+            res[index:index+len(objs)]=[pickle.loads(obj) for obj in objs]
+    return res
+
+__exports__=[flux_envelope_analysis,flux_envelope_analysis_many,sweep,solve_async]
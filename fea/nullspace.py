@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+import logging
+log=logging.getLogger('fea.nullspace')
+
+from collections import defaultdict
+from optlang.symbolics import Zero
+
+def reparametrize(model,keep,eps=10**-9):
+    """Rewrite an OptLang model over the null space of its equality rows
+
+    The equality rows are eliminated by sparse Gauss-Jordan elimination: each one expresses a pivot variable in the remaining (free) variables.
+    Pivots are picked among the variables in the fewest rows, so the basis stays sparse, and kept variables are only picked when a row has nothing else.
+    The new model has the free variables, with their bounds, and no equality rows. The bounds of each pivot variable become a row (named after its equality row) on its expression in the free variables, and the other rows are rewritten in the free variables
+
+    Kept variables stay variables of the new model, so its projection onto them is unchanged. A kept variable which had to be a pivot keeps one equality row
+
+    Parameters
+    ----------
+    model : :class:`optlang.Model`
+        The model to rewrite. It is left as it is
+    keep : iterable
+        OptLang variables (or their names) which must stay variables
+    eps : float
+        Coefficients smaller than this are dropped, and an equality row left without variables must hold within it. Default 1E-9
+
+    Returns
+    -------
+    The new :class:`optlang.Model`, of the same interface as the given one
+
+    Raises
+    ------
+    ValueError
+        If the equality rows are inconsistent, or a row left without variables can't hold
+    """
+    keep=set(getattr(v,'name',v) for v in keep)
+    bounds={v.name:(v.lb,v.ub) for v in model.variables}
+
+    # The equality rows, and which of them each variable is in
+    rows={}
+    rhs={}
+    others=[]
+    col_rows=defaultdict(set)
+    for c in model.constraints:
+        coefs={v.name:a for v,a in c.get_linear_coefficients(c.variables).items() if abs(a)>eps}
+        if c.lb is not None and c.lb==c.ub:
+            rows[c.name]=coefs
+            rhs[c.name]=c.lb
+            for name in coefs:
+                col_rows[name].add(c.name)
+        else:
+            others.append((c.name,coefs,c.lb,c.ub))
+
+    # Gauss-Jordan elimination. pivots maps each pivot variable to its row, which ends up holding it and free variables only
+    pivots={}
+    todo=sorted(rows,key=lambda r: len(rows[r]))
+    for r in todo:
+        coefs=rows[r]
+        if len(coefs)==0:
+            if abs(rhs[r])>eps:
+                raise ValueError('Equality constraints are inconsistent at '+repr(r))
+            del rows[r]
+            continue
+        # Among the larger coefficients, take the variable in the fewest rows, and kept variables last
+        big=max(abs(a) for a in coefs.values())
+        pivot=min((name for name,a in coefs.items() if abs(a)>=0.1*big),key=lambda name: (name in keep,len(col_rows[name]),name))
+        a=coefs[pivot]
+        for other in list(col_rows[pivot]):
+            if other==r:
+                continue
+            _eliminate(rows,rhs,col_rows,other,r,rows[other][pivot]/a)
+        pivots[pivot]=r
+    free=[v.name for v in model.variables if v.name not in pivots]
+
+    # The new model
+    interface=model.interface
+    new=interface.Model(name=model.name)
+    variables={name:interface.Variable(name,lb=bounds[name][0],ub=bounds[name][1]) for name in free}
+    for name in keep:
+        if name in pivots:
+            variables[name]=interface.Variable(name,lb=bounds[name][0],ub=bounds[name][1])
+    new.add(list(variables.values()))
+
+    constraints=[]
+    for pivot,r in pivots.items():
+        a=rows[r][pivot]
+        expr={name:-b/a for name,b in rows[r].items() if name!=pivot}
+        value=rhs[r]/a
+        if pivot in keep:
+            # The row itself, scaled so that pivot-expr=value
+            row={name:-b for name,b in expr.items()}
+            row[pivot]=1
+            constraints.append((r,row,value,value))
+        elif bounds[pivot][0] is not None or bounds[pivot][1] is not None:
+            # lb<=value+expr<=ub
+            constraints.append((r,expr,None if bounds[pivot][0] is None else bounds[pivot][0]-value,None if bounds[pivot][1] is None else bounds[pivot][1]-value))
+    for name,coefs,lb,ub in others:
+        expr=defaultdict(float)
+        shift=0.0
+        for v,b in coefs.items():
+            if v in pivots and v not in keep:
+                r=pivots[v]
+                a=rows[r][v]
+                shift+=b*rhs[r]/a
+                for w,c in rows[r].items():
+                    if w!=v:
+                        expr[w]-=b*c/a
+            else:
+                expr[v]+=b
+        constraints.append((name,expr,None if lb is None else lb-shift,None if ub is None else ub-shift))
+
+    _add_constraints(new,interface,variables,constraints,eps)
+    log.info('Null space of '+str(len(pivots))+' equality rows leaves '+str(len(free))+' free variables')
+    return new
+
+def _eliminate(rows,rhs,col_rows,target,source,factor):
+    """Private. Subtract factor times the source row from the target row"""
+    coefs=rows[target]
+    for name,a in rows[source].items():
+        value=coefs.get(name,0.0)-factor*a
+        if abs(value)>1e-12:
+            if name not in coefs:
+                col_rows[name].add(target)
+            coefs[name]=value
+        elif name in coefs:
+            del coefs[name]
+            col_rows[name].discard(target)
+    rhs[target]-=factor*rhs[source]
+
+def _add_constraints(model,interface,variables,constraints,eps):
+    """Private. Add (name, coefficients, lb, ub) rows to a model, setting the coefficients directly rather than through expressions"""
+    rows=[]
+    for name,expr,lb,ub in constraints:
+        expr={v:a for v,a in expr.items() if abs(a)>eps}
+        if len(expr)==0:
+            if (lb is not None and lb>eps) or (ub is not None and ub<-eps):
+                raise ValueError('Constraint '+repr(name)+' is infeasible once the equality rows are eliminated')
+            continue
+        rows.append((interface.Constraint(Zero,lb=lb,ub=ub,name=name),expr))
+    model.add([c for c,expr in rows])
+    model.update()
+    for c,expr in rows:
+        c.set_linear_coefficients({variables[v]:a for v,a in expr.items()})
+    model.update()
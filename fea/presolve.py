@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+import logging
+log=logging.getLogger('fea.presolve')
+
+from collections import defaultdict
+
+def presolve(model,keep,eps=10**-9):
+    """Shrink an OptLang model without changing its projection onto the kept variables
+
+    Runs until nothing changes:
+
+    * Fixed variables (lb==ub) are substituted into their rows and removed, as are variables in no row
+    * Rows without variables are removed, and rows with one variable become bounds on it
+    * Rows which always hold within the variable bounds are removed
+    * Parallel rows (one a multiple of the other) are merged into one with the tighter bounds
+
+    The kept variables are never removed, though singleton rows may tighten their bounds. The model is changed in place and its objective is left to the searchers
+
+    Parameters
+    ----------
+    model : :class:`optlang.Model`
+        The model to reduce
+    keep : iterable
+        OptLang variables (or their names) which must stay in the model
+    eps : float
+        Tolerance for a row to count as empty or redundant, and for parallel rows. Default 1E-9
+
+    Returns
+    -------
+    A dictionary with the number of 'variables' and 'constraints' removed and of 'bounds' tightened
+    """
+    keep=set(getattr(v,'name',v) for v in keep)
+
+    # Work on plain dictionaries and only touch the model at the end
+    rows={}
+    cols={v.name:[v.lb,v.ub] for v in model.variables}
+    col_rows=defaultdict(set)
+    for c in model.constraints:
+        coefs={v.name:a for v,a in c.get_linear_coefficients(c.variables).items() if a!=0}
+        rows[c.name]=[coefs,c.lb,c.ub]
+        for name in coefs:
+            col_rows[name].add(c.name)
+    changed_rows=set()
+    tightened=set()
+
+    changed=True
+    while changed:
+        changed=False
+
+        # Fixed and unused variables
+        for name,(lb,ub) in list(cols.items()):
+            if name in keep:
+                continue
+            if lb is not None and lb==ub:
+                for r in col_rows.pop(name,()):
+                    coefs,rlb,rub=rows[r]
+                    a=coefs.pop(name)
+                    rows[r]=[coefs,None if rlb is None else rlb-a*lb,None if rub is None else rub-a*lb]
+                    changed_rows.add(r)
+            elif len(col_rows.get(name,()))>0:
+                continue
+            del cols[name]
+            changed=True
+
+        # Empty, singleton and redundant rows
+        for r,(coefs,lb,ub) in list(rows.items()):
+            if len(coefs)==0:
+                if (lb is None or lb<=eps) and (ub is None or ub>=-eps):
+                    _drop_row(rows,col_rows,r)
+                    changed=True
+            elif len(coefs)==1:
+                (name,a),=coefs.items()
+                if a<0:
+                    lb,ub=ub,lb
+                new=[cols[name][0] if lb is None or (cols[name][0] is not None and cols[name][0]>=lb/a) else lb/a,
+                    cols[name][1] if ub is None or (cols[name][1] is not None and cols[name][1]<=ub/a) else ub/a]
+                if new[0] is not None and new[1] is not None and new[0]>new[1]:
+                    # Infeasible, leave it to the solver to report
+                    continue
+                if new!=cols[name]:
+                    cols[name]=new
+                    tightened.add(name)
+                _drop_row(rows,col_rows,r)
+                changed=True
+            else:
+                low,high=_activity(coefs,cols)
+                if (lb is None or low>=lb-eps) and (ub is None or high<=ub+eps):
+                    _drop_row(rows,col_rows,r)
+                    changed=True
+
+        # Parallel rows, scaled so the coefficient of their first variable (by name) is 1
+        parallel={}
+        for r,(coefs,lb,ub) in list(rows.items()):
+            if len(coefs)==0:
+                # Infeasible (the others were dropped above), leave it to the solver to report
+                continue
+            pivot=coefs[min(coefs)]
+            key=tuple(sorted((name,round(a/pivot,12)) for name,a in coefs.items()))
+            lb,ub=(None if lb is None else lb/pivot),(None if ub is None else ub/pivot)
+            if pivot<0:
+                lb,ub=ub,lb
+            if key not in parallel:
+                parallel[key]=(r,pivot)
+                continue
+            first,first_pivot=parallel[key]
+            flb,fub=rows[first][1:]
+            flb,fub=(None if flb is None else flb/first_pivot),(None if fub is None else fub/first_pivot)
+            if first_pivot<0:
+                flb,fub=fub,flb
+            lb=flb if lb is None or (flb is not None and flb>=lb) else lb
+            ub=fub if ub is None or (fub is not None and fub<=ub) else ub
+            if lb is not None and ub is not None and lb>ub+eps:
+                # Infeasible, leave it to the solver to report
+                continue
+            # Store the merged bounds on the first row, back in its own scale
+            if first_pivot<0:
+                lb,ub=ub,lb
+            rows[first]=[rows[first][0],None if lb is None else lb*first_pivot,None if ub is None else ub*first_pivot]
+            changed_rows.add(first)
+            _drop_row(rows,col_rows,r)
+            changed=True
+
+    # Now apply everything to the model
+    dropped=[c for c in model.constraints if c.name not in rows]
+    removed=[v for v in model.variables if v.name not in cols]
+    model.remove(dropped)
+    for r in changed_rows:
+        if r in rows:
+            _set_row_bounds(model.constraints[r],rows[r][1],rows[r][2])
+    for name in tightened:
+        if name in cols:
+            model.variables[name].set_bounds(*cols[name])
+    model.remove(removed)
+    model.update()
+
+    res={'variables':len(removed),'constraints':len(dropped),'bounds':len(tightened & set(cols))}
+    log.info('Presolve removed '+str(res['variables'])+' variables and '+str(res['constraints'])+' constraints and tightened '+str(res['bounds'])+' bounds')
+    return res
+
+def _drop_row(rows,col_rows,r):
+    """Private. Forget a row"""
+    for name in rows.pop(r)[0]:
+        col_rows[name].discard(r)
+
+def _activity(coefs,cols):
+    """Private. The lowest and highest value a row can take within the variable bounds (None counts as infinite)"""
+    low=high=0.0
+    for name,a in coefs.items():
+        lb,ub=cols[name]
+        if a<0:
+            lb,ub=ub,lb
+        low+=float('-inf') if lb is None else a*lb
+        high+=float('inf') if ub is None else a*ub
+    return low,high
+
+def _set_row_bounds(constraint,lb,ub):
+    """Private. Set both bounds of a constraint, in whichever order keeps lb<=ub on the way"""
+    if lb is not None and constraint.ub is not None and lb>constraint.ub:
+        constraint.ub=ub
+        constraint.lb=lb
+    else:
+        constraint.lb=lb
+        constraint.ub=ub
@@ -1,14 +1,18 @@
 import logging
 log=logging.getLogger('fea.util')
 
+import sys
 import numpy as np
 
 #>>>>>>>>>>>>>>>>>> UTILITIES <<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
-def lstsq(A,b,eps,title="LstSq Solve"):
+def lstsq(A,b,eps,title="LstSq Solve",stats=None):
     """Internal lstsq solver
     
-    Mostly critical for logging when debugging
+    Mostly critical for logging when debugging. Counted and timed as 'lstsq' in stats (a :class:`fea.Stats`) if given
     """
+    if stats is not None:
+        with stats.timer('lstsq'):
+            return lstsq(A,b,eps,title=title)
     try:
         # If square A, use np.linalg.solve instead of np.linalg.lstsq. This should be faster (I hope!)
         shape=np.shape(A)
@@ -29,6 +33,99 @@ def lstsq(A,b,eps,title="LstSq Solve"):
     except np.linalg.linalg.LinAlgError:
         raise ValueError('LstSq Result was invalid')
 
+def coefficients(vector,variables):
+    """Internal helper mapping a vector over the target variables to coefficients of the underlying optlang variables
+
+    Parameters
+    ----------
+    vector: :class:`numpy.ndarray`
+        One value per target variable
+    variables: iterable of :class:`fea.VWrapper`
+        The target variables. Split (forward/reverse) variables give the reverse variable the negated value
+    """
+    res={}
+    for c,v in zip(vector,variables):
+        res[v.vars[0]]=c
+        if v.complex:
+            res[v.vars[1]]=-c
+    return res
+
+def lstsq_many(A,B,eps,title="LstSq Solve",stats=None):
+    """Internal lstsq solver for several right-hand sides sharing one matrix
+
+    A is factored once for all columns of B. Counted and timed as 'lstsq' in stats (a :class:`fea.Stats`) if given
+
+    Returns
+    -------
+    The solutions as the columns of an array, and a boolean mask of the columns whose residuals are within eps
+    """
+    if stats is not None:
+        with stats.timer('lstsq'):
+            return lstsq_many(A,B,eps,title=title)
+    try:
+        shape=np.shape(A)
+        if shape[0]==shape[1]:
+            X=np.linalg.solve(A,B)
+            ok=np.ones(np.shape(B)[1],dtype=bool)
+        else:
+            X=np.linalg.lstsq(A,B)[0]
+            ok=np.sum(np.power(np.dot(A,X)-B,2),axis=0)<=len(A)*eps**2
+    except np.linalg.linalg.LinAlgError:
+        raise ValueError('LstSq Result was invalid')
+
+    if log.getEffectiveLevel()<=10: # VERY expensive logging operation, but incredibly useful
+        for j in range(np.shape(B)[1]):
+            _log_lstsq(A,B[:,j],[X[:,j],[]],title=title)
+    return X,ok
+
+class RowMatrix:
+    """Internal growable matrix holding one row per key
+
+    Rows are kept contiguous so a sweep over all of them is a single numpy operation. Removing a row moves the last row into its place
+    """
+    def __init__(self,width):
+        self._data=np.zeros((16,width))
+        self.keys=[]
+        self._rows={}
+
+    def add(self,key,row):
+        """Add (or replace) the row for a key"""
+        if key in self._rows:
+            self._data[self._rows[key]]=row
+            return
+        if len(self.keys)==len(self._data):
+            self._data=np.concatenate([self._data,np.zeros_like(self._data)])
+        self._rows[key]=len(self.keys)
+        self._data[len(self.keys)]=row
+        self.keys.append(key)
+
+    def remove(self,key):
+        """Remove the row for a key, if present"""
+        i=self._rows.pop(key,None)
+        if i is None:
+            return
+        last=self.keys.pop()
+        if i<len(self.keys):
+            self._data[i]=self._data[len(self.keys)]
+            self.keys[i]=last
+            self._rows[last]=i
+
+    @property
+    def data(self):
+        """View of the stored rows"""
+        return self._data[:len(self.keys)]
+
+    @property
+    def nbytes(self):
+        """Bytes held by the rows (including those grown into but not used yet) and the lookup of their keys"""
+        return self._data.nbytes+sys.getsizeof(self._rows)+sys.getsizeof(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self,key):
+        return key in self._rows
+
 def _log_lstsq(A,b,res,pre='\t',title="LstSq Solve"):
     """Internal helper function to properly log lstsq problems
 
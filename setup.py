@@ -10,6 +10,9 @@ extras={
         ],
         'lattice': [
             'scipy'
+        ],
+        'highs': [
+            'scipy>=1.7'
         ]
     }
 
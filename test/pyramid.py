@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+from optlang import *
+
+
+def pyramid(back=1):
+    """The pyramid from the examples, shared by the tests
+
+    Parameters
+    ----------
+    back : float
+        Upper bound of the back wall. Default 1
+
+    Returns
+    -------
+    The :class:`optlang.Model` and a list of its variables x, y and z
+    """
+    model = Model(name='Pyramid')
+    x,y,z = (Variable('x'),Variable('y'),Variable('z'))
+    model.add([x,y,z])
+    model.add(Constraint(y,lb=0,name='base'))
+    model.add(Constraint(-x+y,ub=1,name='left_wall'))
+    model.add(Constraint(x+y,ub=1,name='right_wall'))
+    model.add(Constraint(-z+y,ub=1,name='front_wall'))
+    model.add(Constraint(z+y,ub=back,name='back_wall'))
+    return model,[x,y,z]
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+import asyncio
+import unittest
+from .pyramid import pyramid
+from fea import flux_envelope_analysis as fea, AsyncPool
+
+
+class AsyncPoolSolve(unittest.TestCase):
+    def setUp(self):
+        self.model,(self.x,self.y,self.z) = pyramid()
+        self.pool=AsyncPool(2)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_concurrentJobs(self):
+        """More jobs than workers should all solve like flux_envelope_analysis"""
+        combos=[[self.x,self.y,self.z],[self.x,self.y],[self.y,self.z],[self.x,self.z]]
+        async def run():
+            return await asyncio.gather(*[self.pool.solve(self.model,combo) for combo in combos])
+        res=asyncio.run(run())
+
+        for combo,reduced in zip(combos,res):
+            single=fea(self.model,combo)
+            self.assertTrue(reduced.complete)
+            self.assertEqual([v.name for v in reduced._variables],[v.name for v in combo])
+            self.assertEqual(list(single.f_vector),list(reduced.f_vector))
+
+    def test_cancel(self):
+        """A cancelled job should raise CancelledError and leave the pool usable"""
+        async def run():
+            task=asyncio.ensure_future(self.pool.solve(self.model,[self.x,self.y,self.z]))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return await self.pool.solve(self.model,[self.x,self.y,self.z])
+        self.assertTrue(asyncio.run(run()).complete)
+
+    def test_aclose(self):
+        """Awaiting aclose should shut the pool down from inside the event loop"""
+        async def run():
+            res=await self.pool.solve(self.model,[self.x,self.y,self.z])
+            await self.pool.aclose()
+            return res
+        self.assertTrue(asyncio.run(run()).complete)
+        self.assertIsNone(self.pool._executor)
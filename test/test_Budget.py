@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+from .pyramid import pyramid
+from fea import LatticeGraph
+
+
+class BudgetStopsSolve(unittest.TestCase):
+    def setUp(self):
+        self.model,(self.x,self.y,self.z) = pyramid()
+
+    def test_lpBudget(self):
+        """Solving should stop at the LP budget with consistent approximations, and carry on afterwards"""
+        g=LatticeGraph(self.model,[self.x,self.y,self.z])
+        g.solve(200,lp_budget=6)
+        self.assertFalse(g.complete)
+        self.assertLessEqual(g.stats['lp'],6)
+        self.assertGreater(g.remaining,0)
+
+        A,b=g.outer_approximation()
+        V=g.inner_approximation()
+        self.assertEqual(A.shape[1],3)
+        self.assertEqual(V.shape[1],3)
+        self.assertTrue(np.all(V.dot(A.T)>=b-10**-4))
+
+        g.solve(200,lp_timeout=10)
+        self.assertTrue(g.complete)
+        self.assertEqual(g.remaining,0)
+        # The apex is degenerate, so compare rounded rather than by key
+        A,b=g.outer_approximation()
+        self.assertEqual(len(np.unique(np.round(np.column_stack([A,b]),3),axis=0)),5)
+        self.assertEqual(len(np.unique(np.round(g.inner_approximation(),3),axis=0)),5)
+
+    def test_timeBudget(self):
+        """An exhausted time budget should not search at all"""
+        g=LatticeGraph(self.model,[self.x,self.y,self.z])
+        self.assertEqual(g.solve(200,time_budget=0),0)
+        self.assertEqual(g.stats['lp'],0)
+        self.assertEqual(g.remaining,1)
+
+    def test_stop(self):
+        """Solving should stop once the stop callback returns True"""
+        g=LatticeGraph(self.model,[self.x,self.y,self.z])
+        self.assertEqual(g.solve(200,stop=lambda: True),0)
+        self.assertEqual(g.stats['lp'],0)
+        g.solve(200,stop=lambda: g.complete)
+        self.assertTrue(g.complete)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+import os
+import tempfile
+import unittest
+import numpy as np
+from .pyramid import pyramid
+from fea import LatticeGraph
+
+
+class CheckpointResumes(unittest.TestCase):
+    def setUp(self):
+        self.model,(self.x,self.y,self.z) = pyramid()
+
+        fd,self.path=tempfile.mkstemp(suffix='.npz')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_resumeRestoresState(self):
+        """A resumed graph should hold the same nodes, edges, queue and f-vector as the saved one"""
+        g=LatticeGraph(self.model,[self.x,self.y,self.z])
+        g.solve(4)
+        g.save_checkpoint(self.path)
+        r=LatticeGraph.resume(self.path,self.model)
+
+        self.assertEqual(set(g.nodes()),set(r.nodes()))
+        self.assertEqual(set(g.edges()),set(r.edges()))
+        self.assertEqual(list(g.queue),list(r.queue))
+        self.assertEqual(list(g.f_vector),list(r.f_vector))
+        self.assertEqual(g._complete_halfspaces,r._complete_halfspaces)
+        self.assertEqual(g._iterations,r._iterations)
+
+    def test_resumedSolutionMatches(self):
+        """Solving on from a checkpoint should give the same facets and vertices as solving in one go"""
+        full=LatticeGraph(self.model,[self.x,self.y,self.z])
+        full.solve(200)
+
+        g=LatticeGraph(self.model,[self.x,self.y,self.z])
+        g.solve(4)
+        g.save_checkpoint(self.path)
+        r=LatticeGraph.resume(self.path,self.model,variables=[self.x,self.y,self.z])
+        r.solve(200)
+
+        self.assertTrue(r.complete)
+        self.assertEqual(list(full.f_vector),list(r.f_vector))
+        self.assertEqual(len(full.get_facets()^r.get_facets()),0)
+        points=lambda g: sorted(tuple(np.round(v.point,4)+0.0) for v in g.get_vertices())
+        self.assertEqual(points(full),points(r))
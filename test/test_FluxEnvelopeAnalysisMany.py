@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+import unittest
+from .pyramid import pyramid
+from fea import flux_envelope_analysis as fea, flux_envelope_analysis_many
+from itertools import combinations
+
+
+class ManyMatchesSingle(unittest.TestCase):
+    def setUp(self):
+        # The pyramid from the examples, with a tighter max_value so bounds get changed while solving
+        self.model,self.variables = pyramid()
+        self.max_value=0.5
+
+    def test_batchSolutionsMatchSingleSolutions(self):
+        """Every combination solved in a batch should match solving it on its own"""
+        combos=list(combinations(self.variables,2))+[tuple(self.variables)]
+        found=[]
+        for combo,reduced in flux_envelope_analysis_many(self.model,combos,workers=2,max_value=self.max_value):
+            single=fea(self.model,combo,max_value=self.max_value)
+            found.append(combo)
+
+            self.assertTrue(reduced.complete)
+            self.assertEqual([str(v) for v in reduced._variables],[v.name for v in combo])
+            self.assertEqual(len(single.get_facets()^reduced.get_facets()),0)
+            self.assertEqual(len(single.get_vertices()^reduced.get_vertices()),0)
+
+        self.assertEqual(len(found),len(combos))
+        self.assertEqual(set(found),set(combos))
+
+    def test_modelIsUnchanged(self):
+        """Solving a batch must not change the original model"""
+        list(flux_envelope_analysis_many(self.model,combinations(self.variables,2),workers=1,max_value=self.max_value))
+        for v in self.model.variables:
+            self.assertEqual((v.lb,v.ub),(None,None))
+        self.assertEqual(len(self.model.constraints),5)
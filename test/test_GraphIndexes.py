@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+from optlang import *
+from fea import LatticeGraph, Node
+from fea.util import RowMatrix
+
+
+class GraphIndexesMatchScan(unittest.TestCase):
+    def setUp(self):
+        # A random 5D polytope reduced to 3D, whose solve also removes a few nodes again
+        np.random.seed(0)
+        rs=np.random.RandomState(5)
+        self.model=Model(name='Random')
+        self.variables=[Variable('v'+str(i),lb=-10,ub=10) for i in range(5)]
+        self.model.add(self.variables)
+        for i in range(10):
+            val=rs.rand(5)
+            val=val/np.linalg.norm(val)
+            cns=(rs.random_sample()-.5)*20
+            if cns>0:
+                self.model.add(Constraint(np.dot(self.variables,val),ub=cns,name='C'+str(i)))
+            else:
+                self.model.add(Constraint(np.dot(self.variables,val),lb=cns,name='C'+str(i)))
+        self.graph=LatticeGraph(self.model,self.variables[:3],eps=10**-4)
+
+    def steps(self):
+        """Solve one search at a time, yielding the graph after each, then remove a facet and yield it once more"""
+        g=self.graph
+        for i in range(500):
+            if len(g.queue)==0 or g.complete:
+                break
+            g.solve(1)
+            yield g
+        g.remove_node(sorted(g.get_facets(),key=lambda f: f.id)[0])
+        yield g
+
+    def test_nodeIds(self):
+        """Every node should be found by its id and by an equal node, and removed nodes by neither"""
+        seen={}
+        for g in self.steps():
+            nodes=set(g.nodes())
+            self.assertEqual(set(g._node_ids.values()),nodes)
+            for n in nodes:
+                self.assertIs(g.get_node(n.id),n)
+                self.assertIs(g.get_node(Node(n,n=g.N)),n)
+                seen[n.id]=n
+            for i,n in seen.items():
+                if n not in nodes:
+                    self.assertIsNone(g.get_node(i))
+                    self.assertIsNone(g.get_node(Node(n,n=g.N)))
+        self.assertGreater(g.stats['remove_node'],0)
+
+    def test_levelIndexes(self):
+        """Nodes by level, real and complete flags should match a scan of the whole graph"""
+        for g in self.steps():
+            for level in range(g.N+1):
+                for real in (None,True,False):
+                    for complete in (None,True,False):
+                        scan=set(n for n in g.nodes() if n.level==level and (real is None or n.real==real) and (complete is None or g.node[n].get('complete',False)==complete))
+                        self.assertEqual(g.get_nodes_of_level(level,real=real,complete=complete),scan)
+            self.assertEqual(g.get_vertices(),set(n for n in g.nodes() if n.level==0 and n.real and g.node[n].get('complete',False)))
+
+    def full_completeness(self,g):
+        """Recompute the complete halfspaces and vertices from scratch: drop vertices on fewer than N of the halfspaces and halfspaces on fewer than N of the vertices until nothing changes. Also returns the number of passes"""
+        H=set(h for f in g.get_facets(real=True,complete=None) for h in f)
+        V=set(g.get_vertices(real=True,complete=None))
+        passes=0
+        while True:
+            passes+=1
+            newV=set(v for v in V if sum(1 for h in v if h in H)>=g.N)
+            newH=set(h for h in H if sum(1 for v in newV if h in v)>=g.N)
+            if newV==V and newH==H:
+                return H,V,passes
+            H,V=newH,newV
+
+    def test_completeness(self):
+        """The incrementally kept complete halfspaces and vertices should match a full recomputation"""
+        passes=0
+        for g in self.steps():
+            H,V,p=self.full_completeness(g)
+            passes=max(passes,p)
+            self.assertEqual(g._complete_halfspaces,H)
+            self.assertEqual(g._complete_vertices,V)
+            self.assertEqual(g.get_vertices(),V)
+            self.assertEqual(g.f_vector[1],len(V))
+        self.assertGreater(passes,2)
+
+    def test_containment(self):
+        """The facet and vertex matrices should hold exactly the real facets and vertices, and sweeps over them should match checking each pair"""
+        for g in self.steps():
+            facets=set(h for f in g.get_facets(real=True,complete=None) for h in f)
+            vertices=set(g.get_vertices(real=True,complete=None))
+            self.assertEqual(set(g._facet_rows.keys),facets)
+            self.assertEqual(set(g._vertex_rows.keys),vertices)
+            for h,row in zip(g._facet_rows.keys,g._facet_rows.data):
+                self.assertTrue(np.array_equal(row,np.append(h.norm,[h.rhs,h.eps])))
+            for v,row in zip(g._vertex_rows.keys,g._vertex_rows.data):
+                self.assertTrue(np.array_equal(row,v.point))
+            for v in vertices:
+                self.assertEqual(set(g._facets_containing(v.point)),set(h for h in facets if h.contains(v.point)))
+            for h in facets:
+                self.assertEqual(set(g._vertices_on(h)),set(v for v in vertices if h.contains(v.point)))
+
+
+class RowMatrixMatchesDict(unittest.TestCase):
+    def test_addRemove(self):
+        """Adding, replacing and removing rows in any order should keep every key on its own row"""
+        rs=np.random.RandomState(0)
+        m=RowMatrix(3)
+        ref={}
+        for i in range(400):
+            key=rs.randint(60)
+            if rs.rand()<0.4:
+                m.remove(key)
+                ref.pop(key,None)
+            else:
+                ref[key]=rs.rand(3)
+                m.add(key,ref[key])
+            self.assertEqual(len(m),len(ref))
+            self.assertEqual(sorted(m.keys),sorted(ref))
+            self.assertEqual(m.data.shape,(len(ref),3))
+            for k,row in zip(m.keys,m.data):
+                self.assertIn(k,m)
+                self.assertTrue(np.array_equal(row,ref[k]))
+        self.assertNotIn(60,m)
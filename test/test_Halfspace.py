@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+import unittest
+from types import SimpleNamespace
+import numpy as np
+from optlang import *
+from fea import Halfspace, Search, VWrapper
+from fea.Halfspace import _ol_new_constraints
+
+
+class HalfspaceKeyCache(unittest.TestCase):
+    def assertFreshKey(self,h):
+        """The cached key, hash and name should match ones computed from the current data"""
+        key=tuple([h.real]+list(np.round(np.append(h.norm,h.rhs),h.dec)))
+        self.assertEqual(h.key,key)
+        self.assertEqual(hash(h),hash(key))
+        self.assertEqual(h.name,str(key).replace(' ',''))
+
+    def test_equalHalfspacesShareKey(self):
+        """Equal halfspaces should share their key, hash and name however they were built"""
+        a=Halfspace(np.array([1.,1.,0.]),np.array([0.,1.,0.]),eps=10**-4)
+        b=Halfspace(np.array([2.,2.,0.]),np.array([1.,0.,5.]),eps=10**-4)
+        self.assertFreshKey(a)
+        self.assertEqual(a,b)
+        self.assertEqual(hash(a),hash(b))
+        self.assertEqual(a.name,b.name)
+        self.assertEqual(len(set([a,b])),1)
+
+    def test_changesResetKey(self):
+        """Setting norm, point, eps or dec should forget the cached key, hash and name"""
+        a=Halfspace(np.array([1.,0.]),np.array([1.,0.]),eps=10**-4)
+        self.assertFreshKey(a)
+
+        old=a.key
+        a.point=np.array([2.,0.])
+        self.assertNotEqual(a.key,old)
+        self.assertFreshKey(a)
+        self.assertEqual(a,Halfspace(np.array([1.,0.]),np.array([2.,0.]),eps=10**-4))
+
+        for attr,value in (('norm',np.array([3.,4.])),('point',np.array([0.,1.23456])),('eps',10**-2),('dec',1)):
+            old=a.key
+            setattr(a,attr,value)
+            self.assertNotEqual(a.key,old)
+            self.assertFreshKey(a)
+
+
+class HalfspaceRows(unittest.TestCase):
+    def setUp(self):
+        # One target variable split into forward and reverse parts, like a reversible CobraPy reaction
+        self.model = Model(name='Split')
+        self.f,self.r,self.y = (Variable('f',lb=0,ub=10),Variable('r',lb=0,ub=10),Variable('y',lb=-1,ub=2))
+        self.model.add([self.f,self.r,self.y])
+        self.model.add(Constraint(self.f-self.r+self.y,ub=3,name='corner'))
+        self.variables=[SimpleNamespace(forward_variable=self.f,reverse_variable=self.r),self.y]
+
+    def test_numbersOnly(self):
+        """A halfspace should only hold numbers, and only add a row when asked to"""
+        h=Halfspace(np.array([3.,-4.]),np.array([1.,1.]),eps=10**-4)
+        self.assertEqual(len(self.model.constraints),1)
+        for value in vars(h).values():
+            self.assertIsInstance(value,(np.ndarray,float,int,bool,set,tuple,str,type(None)))
+
+        c=h._ol_new_constraint(self.model,[VWrapper(v,self.model) for v in self.variables],eps=10**-4)
+        self.assertEqual(len(self.model.constraints),2)
+        self.assertIs(self.model.constraints[h.name],c)
+        coefs={v.name:a for v,a in c.get_linear_coefficients(c.variables).items()}
+        self.assertEqual(coefs,{'f':0.6,'r':-0.6,'y':-0.8})
+        self.assertAlmostEqual(c.lb,-0.2+10**-4)
+        self.assertAlmostEqual(c.ub,-0.2+10**-4)
+
+    def test_batchedRows(self):
+        """Rows added together should match rows added one at a time, in order"""
+        variables=[VWrapper(v,self.model) for v in self.variables]
+        hs=[Halfspace(np.array([3.,-4.]),np.array([1.,1.]),eps=10**-4),Halfspace(np.array([0.,1.]),np.array([0.,-1.]),eps=10**-4)]
+        rows=_ol_new_constraints(hs,self.model,variables,eps=10**-4)
+        self.assertEqual(len(self.model.constraints),3)
+        for h,c in zip(hs,rows):
+            self.assertIs(self.model.constraints[h.name],c)
+            self.assertAlmostEqual(c.lb,h.rhs+10**-4)
+            self.assertAlmostEqual(c.ub,h.rhs+10**-4)
+        coefs={v.name:a for v,a in rows[1].get_linear_coefficients(rows[1].variables).items()}
+        self.assertEqual(coefs,{'y':1.0})
+
+    def test_searcherRows(self):
+        """A searcher should add rows for the halfspaces of its search only, and take them out again"""
+        s=Search(self.model,self.variables,clone=False)
+        hs=[Halfspace(np.array([1.,0.]),np.array([-1.,0.])),Halfspace(np.array([0.,1.]),np.array([0.,-1.]))]
+        s.set(np.array([-1.,-1.]),hs)
+        self.assertEqual(sorted(self.model.constraints.keys()),sorted(['corner']+[h.name for h in hs]))
+        self.assertTrue(s.get_solution())
+        self.assertTrue(np.allclose(s.vp,[-1,-1],atol=10**-5))
+        s.set(np.array([-1.,-1.]),hs[:1])
+        self.assertEqual(sorted(self.model.constraints.keys()),sorted(['corner',hs[0].name]))
+        s.deactivate()
+        self.assertEqual(list(self.model.constraints.keys()),['corner'])
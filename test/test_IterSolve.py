@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+import unittest
+from .pyramid import pyramid
+from fea import LatticeGraph
+
+
+class IterSolveEvents(unittest.TestCase):
+    def setUp(self):
+        self.model,(self.x,self.y,self.z) = pyramid()
+
+    def test_eventsMatchGraph(self):
+        """The facets and vertices yielded (less those removed) should be the ones in the graph"""
+        g=LatticeGraph(self.model,[self.x,self.y,self.z])
+        found={'facet':set(),'vertex':set(),'complete':set()}
+        for event in g.iter_solve(200):
+            if event.kind=='removed':
+                found['facet'].discard(event.node)
+                found['vertex'].discard(event.node)
+            elif event.kind in found:
+                found[event.kind].add(event.node)
+        self.assertTrue(g.complete)
+        self.assertEqual(found['facet'],g.get_facets(complete=None))
+        self.assertEqual(found['vertex'],g.get_vertices(complete=None))
+        self.assertTrue(g.get_vertices()<=found['complete'])
+
+    def test_stopEarly(self):
+        """Stopping at the first facet should leave a graph which solve can finish"""
+        g=LatticeGraph(self.model,[self.x,self.y,self.z])
+        for event in g.iter_solve(200):
+            if event.kind=='facet':
+                break
+        self.assertIn(event.node,g)
+        self.assertFalse(g.complete)
+        g.solve(200)
+        self.assertTrue(g.complete)
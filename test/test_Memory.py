@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+import pickle
+import unittest
+from .pyramid import pyramid
+from fea import LatticeGraph
+
+
+class SingleModelCopy(unittest.TestCase):
+    def setUp(self):
+        self.model,(self.x,self.y,self.z) = pyramid()
+
+    def test_searcherSharesProblem(self):
+        """The local searcher should solve on the graph's clone, leaving the given model alone"""
+        g=LatticeGraph(self.model,[self.x,self.y,self.z])
+        self.assertIs(g.searcher.m,g._problem)
+        g.solve(200)
+        self.assertTrue(g.complete)
+        self.assertEqual(len(self.model.constraints),5)
+        self.assertEqual(self.model.variables['x'].lb,None)
+
+    def test_pickleLeavesRows(self):
+        """A pickled graph should carry the problem without the searcher's rows, and solve on once unpickled"""
+        full=LatticeGraph(self.model,[self.x,self.y,self.z])
+        full.solve(200)
+
+        g=LatticeGraph(self.model,[self.x,self.y,self.z])
+        g.solve(3)
+        r=pickle.loads(pickle.dumps(g))
+        self.assertEqual(sorted(c.name for c in r._problem.constraints),sorted(c.name for c in self.model.constraints))
+        r.solve(200)
+        self.assertTrue(r.complete)
+        self.assertEqual(list(full.f_vector),list(r.f_vector))
+
+    def test_memoryFootprint(self):
+        """The estimate should count every part and one model for the local searcher"""
+        g=LatticeGraph(self.model,[self.x,self.y,self.z])
+        g.solve(200)
+        rows,constraints=g.searcher.H_cons,len(g._problem.constraints)
+        mem=g.memory_footprint()
+        # Measuring leaves the searcher's rows where they are
+        self.assertIs(g.searcher.H_cons,rows)
+        self.assertEqual(len(g._problem.constraints),constraints)
+        for key in ('halfspaces','nodes','indexes','completeness','model'):
+            self.assertGreater(mem[key],0)
+        self.assertEqual((mem['models'],mem['workers'],mem['pickled']),(1,0,0))
+        self.assertEqual(mem['total'],mem['halfspaces']+mem['nodes']+mem['indexes']+mem['completeness']+mem['model'])
+
+    def test_poolAddsNoModel(self):
+        """With a pool the workers hold the models, so the graph's own footprint should not grow, and the problem comes back once the pool is gone"""
+        serial=LatticeGraph(self.model,[self.x,self.y,self.z]).memory_footprint()
+        g=LatticeGraph(self.model,[self.x,self.y,self.z],processes=2)
+        try:
+            pooled=g.memory_footprint()
+            self.assertIsNone(g._model)
+            self.assertEqual((pooled['models'],pooled['workers']),(0,2))
+            self.assertGreater(pooled['pickled'],0)
+            self.assertLessEqual(pooled['total'],serial['total'])
+            g.solve(200)
+            self.assertIsNone(g._model)
+        finally:
+            g.close()
+        self.assertTrue(g.complete)
+        self.assertEqual(len(g.to_optlang_model().constraints),5)
+        self.assertEqual(g.memory_footprint()['models'],1)
+        self.assertEqual(len(self.model.constraints),5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+import unittest
+import operator
+import numpy as np
+from fea import flux_envelope_analysis as fea, Node, Halfspace, HalfspaceRegistry
+from .pyramid import pyramid
+
+
+class BitsetMatchesFrozenset(unittest.TestCase):
+    def setUp(self):
+        rs=np.random.RandomState(0)
+        self.halfspaces=[Halfspace(rs.rand(4)-.5,rs.rand(4)-.5,eps=10**-4) for i in range(70)]
+        self.registry=HalfspaceRegistry()
+        self.sets=[[self.halfspaces[i] for i in rs.choice(70,rs.randint(0,6),replace=False)] for j in range(40)]
+        # Some subsets and equal sets too
+        self.sets+=[s[:len(s)//2] for s in self.sets[:10]]+[list(reversed(s)) for s in self.sets[:5]]
+
+    def test_registry(self):
+        """Equal halfspaces should share a number and bitmasks should give back their halfspaces"""
+        h=self.halfspaces[3]
+        copy=Halfspace(2*h.norm,h.point,eps=h.eps)
+        self.assertEqual(self.registry.index(h),self.registry.index(copy))
+        self.assertEqual(len(self.registry),1)
+        for s in self.sets:
+            self.assertEqual(self.registry.halfspaces(self.registry.mask(s)),frozenset(s))
+        self.assertEqual(self.registry.halfspaces(0),frozenset())
+
+    def test_cacheBounded(self):
+        """The registry should only keep the most recently looked up bitmasks, and still give back the others"""
+        registry=HalfspaceRegistry(cache_size=5)
+        masks=[registry.mask(s) for s in self.sets]
+        for m,s in zip(masks,self.sets):
+            self.assertEqual(registry.halfspaces(m),frozenset(s))
+            self.assertLessEqual(len(registry._members),5)
+        self.assertEqual(registry.halfspaces(masks[0]),frozenset(self.sets[0]))
+
+    def test_operators(self):
+        """Unions, intersections and differences should hold the same halfspaces with and without bitmasks"""
+        for a in self.sets:
+            for b in self.sets:
+                ba,bb=Node(a,n=4,registry=self.registry),Node(b,n=4,registry=self.registry)
+                pa,pb=Node(a,n=4),Node(b,n=4)
+                for op in (operator.and_,operator.or_,operator.xor,operator.sub):
+                    res,ref=op(ba,bb),op(pa,pb)
+                    self.assertIsInstance(res,Node)
+                    self.assertEqual(frozenset(res),frozenset(ref))
+                    self.assertEqual(res.mask,self.registry.mask(ref))
+                    self.assertEqual(hash(res),hash(ref))
+                    self.assertEqual(res.n,4)
+
+    def test_comparisons(self):
+        """Equality and subset tests should agree with and without bitmasks, and mixed nodes should still match"""
+        for a in self.sets:
+            for b in self.sets:
+                ba,bb=Node(a,n=4,registry=self.registry),Node(b,n=4,registry=self.registry)
+                pa,pb=Node(a,n=4),Node(b,n=4)
+                for op in (operator.eq,operator.ne,operator.le,operator.lt,operator.ge,operator.gt):
+                    self.assertEqual(op(ba,bb),op(pa,pb))
+                    self.assertEqual(op(ba,pb),op(pa,pb))
+        lookup={Node(a,n=4,registry=self.registry):i for i,a in enumerate(self.sets)}
+        for a in self.sets:
+            self.assertIn(Node(a,n=4),lookup)
+
+    def test_bitsetSolutionMatches(self):
+        """Solving with bitmask nodes should find the same polytope"""
+        model,variables=pyramid()
+        single=fea(model,variables)
+        reduced=fea(model,variables,bitset=True)
+        self.assertTrue(reduced.complete)
+        self.assertEqual(len(single.get_facets()^reduced.get_facets()),0)
+        self.assertTrue(all(n.mask is not None for n in reduced.nodes()))
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+from optlang import *
+from fea import flux_envelope_analysis as fea, reparametrize
+
+
+class NullspaceKeepsProjection(unittest.TestCase):
+    def setUp(self):
+        # A small network, x -> A -> B -> y with A -> C -> z and B -> C, and a shared capacity
+        self.model = Model(name='Network')
+        self.x,self.y,self.z,self.r1,self.r2,self.r3 = [Variable(n,lb=0,ub=10) for n in ('x','y','z','r1','r2','r3')]
+        self.model.add([self.x,self.y,self.z,self.r1,self.r2,self.r3])
+        self.model.add(Constraint(self.x-self.r1-self.r2,lb=0,ub=0,name='A'))
+        self.model.add(Constraint(self.r1-self.y-self.r3,lb=0,ub=0,name='B'))
+        self.model.add(Constraint(self.r2+self.r3-self.z,lb=0,ub=0,name='C'))
+        self.model.add(Constraint(self.r1+2*self.r2,ub=12,name='capacity'))
+        self.variables=[self.r1,self.r2,self.y]
+
+    def test_reparametrize(self):
+        """The rewritten model should only have the free variables and no equality rows"""
+        new=reparametrize(self.model,self.variables)
+        self.assertEqual(sorted(new.variables.keys()),['r1','r2','y'])
+        self.assertTrue(all(c.lb is None or c.lb!=c.ub for c in new.constraints))
+        # The given model is left alone
+        self.assertEqual(len(self.model.variables),6)
+
+    def test_samePolytope(self):
+        """The rewritten problem should have the same projection"""
+        facets=lambda g: sorted(tuple(np.round(np.append(h.norm,h.rhs),3)+0.0) for f in g.get_facets() for h in f)
+        single=fea(self.model,self.variables)
+        reduced=fea(self.model,self.variables,nullspace=True)
+        self.assertTrue(reduced.complete)
+        self.assertEqual(list(single.f_vector),list(reduced.f_vector))
+        self.assertEqual(facets(single),facets(reduced))
+        self.assertEqual(len(reduced._problem.variables),3)
+
+    def test_inconsistent(self):
+        """Equality rows without a solution should be refused"""
+        self.model.add(Constraint(self.x-self.r1-self.r2,lb=1,ub=1,name='A2'))
+        with self.assertRaises(ValueError):
+            reparametrize(self.model,self.variables)
+
+    def test_keptPivot(self):
+        """An equality row with only kept variables should stay as it is"""
+        model = Model(name='Kept')
+        x,y = Variable('x',lb=0,ub=10),Variable('y',lb=0,ub=10)
+        model.add([x,y])
+        model.add(Constraint(2*x+2*y,lb=2,ub=2,name='sum'))
+        new=reparametrize(model,[x,y])
+        row=new.constraints['sum']
+        self.assertEqual({v.name:a for v,a in row.get_linear_coefficients(row.variables).items()},{'x':1,'y':1})
+        self.assertEqual((row.lb,row.ub),(1,1))
+        new.objective=Objective(new.variables['y'],direction='max')
+        new.optimize()
+        self.assertAlmostEqual(new.objective.value,1)
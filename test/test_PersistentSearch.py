@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+from .pyramid import pyramid
+from fea import flux_envelope_analysis as fea
+
+
+class PersistentSearchMatchesSearch(unittest.TestCase):
+    def setUp(self):
+        self.model,(self.x,self.y,self.z) = pyramid()
+
+    def test_persistentSolutionMatches(self):
+        """Reusing the constraint rows between searches should give the same facets and vertices"""
+        for combo in ([self.x,self.y],[self.x,self.z],[self.x,self.y,self.z]):
+            fresh=fea(self.model,combo)
+            persistent=fea(self.model,combo,persistent=True)
+
+            self.assertTrue(persistent.complete)
+            self.assertEqual(list(fresh.f_vector),list(persistent.f_vector))
+            self.assertEqual(len(fresh.get_facets()^persistent.get_facets()),0)
+            # A warm-started solve may end on another optimal basis at degenerate vertices, so compare the points rather than the halfspaces found there
+            points=lambda g: sorted(tuple(np.round(v.point,4)+0.0) for v in g.get_vertices())
+            self.assertEqual(points(fresh),points(persistent))
+
+    def test_closeRemovesRows(self):
+        """Closing the graph should leave the model with only its own constraints"""
+        from fea import LatticeGraph
+        g=LatticeGraph(self.model,[self.x,self.y,self.z],clone=False,persistent=True)
+        g.solve(50)
+        g.close()
+        self.assertEqual(len(self.model.constraints),5)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+from optlang import *
+from .pyramid import pyramid
+from fea import flux_envelope_analysis as fea, presolve
+
+
+class PresolveKeepsProjection(unittest.TestCase):
+    def setUp(self):
+        # The pyramid from the examples, padded with a fixed variable, a free variable and rows presolve can remove
+        self.model,(self.x,self.y,self.z) = pyramid()
+        self.w,self.u,self.f = (Variable('w',lb=0.5,ub=0.5),Variable('u',lb=0,ub=1),Variable('f'))
+        self.model.add([self.w,self.u,self.f])
+        # The right wall goes through the fixed variable and the front wall is scaled
+        self.model.constraints['right_wall'].set_linear_coefficients({self.w:1})
+        self.model.constraints['right_wall'].ub = 1.5
+        self.model.constraints['front_wall'].set_linear_coefficients({self.z:-2,self.y:2})
+        self.model.constraints['front_wall'].ub = 2
+        self.model.add(Constraint(-self.z+self.y,ub=3,name='parallel_wall'))
+        self.model.add(Constraint(2*self.u,ub=5,name='singleton'))
+        self.model.add(Constraint(self.u+self.w,ub=10,name='redundant'))
+        self.model.add(Constraint(self.f-self.w,lb=0,ub=0,name='fixes_f'))
+
+    def test_presolve(self):
+        """Presolve should remove what it can and leave everything else alone"""
+        res=presolve(self.model,[self.x,self.y,self.z])
+        self.assertEqual(res,{'variables':3,'constraints':5,'bounds':1})
+        self.assertEqual(sorted(self.model.constraints.keys()),['back_wall','front_wall','left_wall','right_wall'])
+        self.assertEqual(sorted(self.model.variables.keys()),['x','y','z'])
+        self.assertEqual((self.model.variables['y'].lb,self.model.variables['y'].ub),(0,None))
+        self.assertEqual(self.model.constraints['right_wall'].ub,1)
+
+    def test_samePolytope(self):
+        """The presolved problem should have the same projection"""
+        facets=lambda g: sorted(tuple(np.round(np.append(h.norm,h.rhs),3)+0.0) for f in g.get_facets() for h in f)
+        single=fea(self.model,[self.x,self.y,self.z])
+        reduced=fea(self.model,[self.x,self.y,self.z],presolve=True)
+        self.assertTrue(reduced.complete)
+        self.assertEqual(list(single.f_vector),list(reduced.f_vector))
+        self.assertEqual(facets(single),facets(reduced))
+        self.assertEqual(reduced.stats['presolve_constraints'],5)
+        # The model itself was cloned, so it is unchanged
+        self.assertEqual(len(self.model.constraints),9)
+
+    def test_infeasibleEmptyRow(self):
+        """A row left without variables which cannot hold should stay for the solver to report"""
+        self.model.add(Constraint(self.w,ub=0.25,name='too_low'))
+        presolve(self.model,[self.x,self.y,self.z])
+        self.assertIn('too_low',self.model.constraints)
+        self.model.optimize()
+        self.assertEqual(self.model.status,'infeasible')
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+from optlang import *
+from .pyramid import pyramid
+from fea import flux_envelope_analysis as fea
+
+
+class PriorSolutionMatches(unittest.TestCase):
+    def assertSameSolution(self,ref,res):
+        self.assertTrue(res.complete)
+        self.assertEqual(list(ref.f_vector),list(res.f_vector))
+        self.assertEqual(len(ref.get_facets()^res.get_facets()),0)
+        points=lambda g: sorted(tuple(np.round(v.point,4)+0.0) for v in g.get_vertices())
+        self.assertEqual(points(ref),points(res))
+
+    def test_unchangedNeedsNoSearch(self):
+        """Warm-starting from the solution to the same problem should need no further searches"""
+        model,variables=pyramid()
+        prior=fea(model,variables)
+        res=fea(model,variables,prior=prior)
+        self.assertEqual(res._iterations,0)
+        # Only the prior's facets and vertices are checked, which takes fewer LPs than finding them
+        self.assertLess(res.stats['lp'],prior.stats['lp'])
+        self.assertSameSolution(prior,res)
+
+    def test_changedSolutionMatches(self):
+        """Warm-starting after moving a wall should give the same solution as starting from scratch"""
+        model,variables=pyramid()
+        prior=fea(model,variables)
+        for back in (0.5,2):
+            model,variables=pyramid(back)
+            self.assertSameSolution(fea(model,variables),fea(model,variables,prior=prior))
+
+    def test_cutVertexIsDropped(self):
+        """A vertex whose facets all still hold but which a new constraint next to a moved facet cuts off should not be seeded"""
+        model,variables=pyramid()
+        prior=fea(model,variables)
+        model,variables=pyramid()
+        model.constraints['left_wall'].ub=0.5
+        model.add(Constraint(variables[0],ub=0.8,name='cap'))
+        self.assertSameSolution(fea(model,variables),fea(model,variables,prior=prior))
+
+    def test_cutWithoutMovingFacets(self):
+        """A new bound which cuts into the prior solution without moving any of its facets should not leave the prior solution in place"""
+        model,variables=pyramid()
+        prior=fea(model,variables)
+        for lb,ub,f_vector in ((-0.5,0.5,[1,9,14,7,1]),(None,0.8,[1,7,11,6,1])):
+            model,variables=pyramid()
+            variables[0].set_bounds(lb,ub)
+            ref=fea(model,variables)
+            self.assertEqual(list(ref.f_vector),f_vector)
+            self.assertSameSolution(ref,fea(model,variables,prior=prior))
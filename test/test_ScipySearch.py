@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+from .pyramid import pyramid
+from fea import flux_envelope_analysis as fea
+
+
+class ScipySearchMatchesSearch(unittest.TestCase):
+    def setUp(self):
+        self.model,(self.x,self.y,self.z) = pyramid()
+
+    def test_scipySolutionMatches(self):
+        """The scipy backend should find the same facets and vertices as the optlang one"""
+        for combo in ([self.x,self.y],[self.x,self.z],[self.x,self.y,self.z]):
+            ref=fea(self.model,combo)
+            res=fea(self.model,combo,backend='scipy')
+
+            self.assertTrue(res.complete)
+            self.assertEqual(list(ref.f_vector),list(res.f_vector))
+            self.assertEqual(len(ref.get_facets()^res.get_facets()),0)
+            points=lambda g: sorted(tuple(np.round(v.point,4)+0.0) for v in g.get_vertices())
+            self.assertEqual(points(ref),points(res))
+
+    def test_unknownBackend(self):
+        """Asking for a backend that does not exist should fail"""
+        with self.assertRaises(ValueError):
+            fea(self.model,[self.x,self.y],backend='nope')
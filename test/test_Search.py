@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import unittest
+from types import SimpleNamespace
+import numpy as np
+from optlang import *
+from fea import Search, VWrapper
+
+
+class SnapshotMatchesSolver(unittest.TestCase):
+    def setUp(self):
+        # A square with one target variable split into forward and reverse parts, like a reversible CobraPy reaction
+        self.model = Model(name='Split')
+        self.f,self.r,self.y = (Variable('f',lb=0,ub=10),Variable('r',lb=0,ub=10),Variable('y',lb=-1,ub=2))
+        self.model.add([self.f,self.r,self.y])
+        self.model.add(Constraint(self.f-self.r+self.y,ub=3,name='corner'))
+        self.model.add(Constraint(self.f-self.r,lb=-2,name='left'))
+        self.variables=[SimpleNamespace(forward_variable=self.f,reverse_variable=self.r),self.y]
+
+    def assertSnapshot(self,s):
+        """The bulk values should match reading the solver one value at a time"""
+        self.assertTrue(np.allclose(s.vp,[v.primal for v in s.v]))
+        self.assertTrue(np.allclose(s.vd,[v.dual for v in s.v]))
+        self.assertTrue(np.allclose(s.Hd(),[s.m.constraints[h.name].dual for h in s.H]))
+        self.assertTrue(np.allclose(s._Hrhs,[s.m.constraints[h.name].ub for h in s.H]))
+        self.assertAlmostEqual(s._objective_value,s.m.objective.value)
+
+    def test_snapshot(self):
+        """Values after each search should match the solver's, with or without persistent rows"""
+        for persistent in (False,True):
+            s=Search(self.model,self.variables,eps=10**-6,persistent=persistent)
+            self.assertTrue(s.v[0].complex)
+
+            s.set(np.array([1.,0.]),[])
+            self.assertTrue(s.get_solution())
+            self.assertSnapshot(s)
+            self.assertTrue(np.allclose(s.vp,[4,-1]))
+            h=s.bounding_halfspace()
+
+            s.set(np.array([1.,-1.]),[h])
+            self.assertTrue(s.get_solution())
+            self.assertSnapshot(s)
+            self.assertNotEqual(s.Hd(0),0)
+            self.assertAlmostEqual(s.Heps(0),10**-6)
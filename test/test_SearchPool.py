@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+import unittest
+from .pyramid import pyramid
+from fea import flux_envelope_analysis as fea
+
+
+class SearchPoolMatchesSearch(unittest.TestCase):
+    def setUp(self):
+        self.model,(self.x,self.y,self.z) = pyramid()
+
+    def test_parallelSolutionMatchesSerial(self):
+        """Solving with a pool of searchers should give the same facets and vertices as a single searcher"""
+        for combo in ([self.x,self.y],[self.x,self.z],[self.x,self.y,self.z]):
+            serial=fea(self.model,combo)
+            parallel=fea(self.model,combo,processes=2)
+
+            self.assertTrue(parallel.complete)
+            self.assertEqual(list(serial.f_vector),list(parallel.f_vector))
+            self.assertEqual(len(serial.get_facets()^parallel.get_facets()),0)
+            self.assertEqual(len(serial.get_vertices()^parallel.get_vertices()),0)
+            self.assertIsNone(parallel.pool)
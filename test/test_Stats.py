@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+import unittest
+from .pyramid import pyramid
+from fea import LatticeGraph
+
+
+class StatsCountSolve(unittest.TestCase):
+    def setUp(self):
+        self.model,(self.x,self.y,self.z) = pyramid()
+
+    def test_statsCountSearches(self):
+        """Every search should be counted, locally and on a pool"""
+        for processes in (1,2):
+            g=LatticeGraph(self.model,[self.x,self.y,self.z],processes=processes)
+            try:
+                ind=g.solve(200)
+            finally:
+                g.close()
+            stats=g.stats
+
+            self.assertTrue(g.complete)
+            self.assertEqual(stats['real_halfspaces']+stats['pseudo_halfspaces'],ind)
+            self.assertEqual(stats['lp'],ind+stats['lp_retries']+stats['lp_failures'])
+            self.assertGreater(stats['lstsq'],0)
+            self.assertGreaterEqual(stats['add_node'],g.number_of_nodes())
+            self.assertEqual(stats['solve'],1)
+            self.assertGreater(stats.times['lp'],0)
+            self.assertLessEqual(stats.times['completeness'],stats.times['solve'])
+            self.assertGreaterEqual(len(stats.queue_lengths),ind//processes)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+from optlang import *
+from .pyramid import pyramid
+from fea import flux_envelope_analysis as fea, sweep, LatticeGraph, Search
+
+
+class SweepMatchesSingle(unittest.TestCase):
+    def setUp(self):
+        # The pyramid from the examples, with the back wall set by another variable
+        self.model,(self.x,self.y,self.z) = pyramid()
+        self.w = Variable('w')
+        self.model.add(self.w)
+        self.model.constraints['back_wall'].set_linear_coefficients({self.w:-1})
+        self.model.constraints['back_wall'].ub = 0
+        self.values=[0.5,1,(1,2),2]
+
+    def single(self,value):
+        """Solve one step from scratch"""
+        lb,ub=value if isinstance(value,tuple) else (value,value)
+        self.w.set_bounds(lb,ub)
+        try:
+            return fea(self.model,[self.x,self.y,self.z])
+        finally:
+            self.w.set_bounds(None,None)
+
+    def assertSameSolutions(self,res):
+        self.assertEqual(len(res),len(self.values))
+        points=lambda g: sorted(tuple(np.round(v.point,4)+0.0) for v in g.get_vertices())
+        for value,reduced in zip(self.values,res):
+            single=self.single(value)
+            self.assertTrue(reduced.complete)
+            self.assertEqual(list(single.f_vector),list(reduced.f_vector))
+            self.assertEqual(len(single.get_facets()^reduced.get_facets()),0)
+            self.assertEqual(points(single),points(reduced))
+
+    def test_sweepMatchesSingle(self):
+        """Every step of a sweep should match solving it on its own, and the model should be unchanged"""
+        self.assertSameSolutions(sweep(self.model,[self.x,self.y,self.z],self.w,self.values))
+        self.assertEqual((self.w.lb,self.w.ub),(None,None))
+        self.assertEqual(len(self.model.constraints),5)
+
+    def test_parallelSweepMatchesSingle(self):
+        """Splitting a sweep across workers should keep the order of the values"""
+        self.assertSameSolutions(sweep(self.model,[self.x,self.y,self.z],self.w,self.values,workers=2))
+
+    def test_stepsKeepTheirModels(self):
+        """Each solution should keep the model as it was for its own step"""
+        res=sweep(self.model,[self.x,self.y,self.z],self.w,self.values)
+        for value,reduced in zip(self.values,res):
+            lb,ub=value if isinstance(value,tuple) else (value,value)
+            self.assertEqual((reduced._problem.variables['w'].lb,reduced._problem.variables['w'].ub),(lb,ub))
+            self.assertEqual(len(reduced._problem.constraints),5)
+        self.assertEqual(len(set(id(r._problem) for r in res)),len(res))
+
+    def test_searcherTakenOver(self):
+        """A graph should solve with a searcher it is given, as long as that searcher solves on its problem"""
+        self.w.set_bounds(1,1)
+        first=LatticeGraph(self.model,[self.x,self.y,self.z],eps=10**-4,clone=False)
+        first.solve(1000)
+        searcher=first._hand_over()
+        graph=LatticeGraph(self.model,[self.x,self.y,self.z],eps=10**-4,clone=False,prior=first,searcher=searcher)
+        self.assertIs(graph.searcher,searcher)
+        self.assertIs(searcher.stats,graph.stats)
+        graph.solve(1000)
+        self.assertTrue(graph.complete)
+        self.assertEqual(list(first.f_vector),list(graph.f_vector))
+        with self.assertRaises(ValueError):
+            LatticeGraph(self.model,[self.x,self.y,self.z],eps=10**-4,searcher=Search(self.model,[self.x,self.y,self.z]))
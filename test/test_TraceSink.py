@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+import os
+import shutil
+import tempfile
+import unittest
+from .pyramid import pyramid
+from fea import LatticeGraph, TraceSink
+
+
+class TraceSinkReplay(unittest.TestCase):
+    def setUp(self):
+        self.model,(self.x,self.y,self.z) = pyramid()
+        self.dir=tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_replayMatchesLattice(self):
+        """Replaying the trace should rebuild the lattice of the solve"""
+        path=os.path.join(self.dir,'trace.jsonl')
+        with TraceSink(path) as sink:
+            g=LatticeGraph(self.model,[self.x,self.y,self.z],sink=sink)
+            g.solve(200)
+        self.assertTrue(g.complete)
+
+        r=TraceSink.replay(path)
+        self.assertEqual(r.number_of_nodes(),g.number_of_nodes())
+        self.assertEqual(r.number_of_edges(),g.number_of_edges())
+        self.assertEqual({frozenset(r.node[n]['halfspaces']) for n in r.nodes()},{frozenset(h.id for h in n) for n in g.nodes()})
+        self.assertEqual({n for n in r.nodes() if r.node[n]['complete']},{n.id for n in g.nodes() if g.node[n].get('complete',False)})
+
+        events=[e['event'] for e in TraceSink.read(path)]
+        self.assertEqual(events.count('bounding'),g.stats['real_halfspaces']+g.stats['pseudo_halfspaces'])
+        self.assertIn('lp',events)
+        searches=set(e['trace'] for e in TraceSink.read(path) if e['event']=='search')
+        self.assertTrue(all(e['trace'] in searches for e in TraceSink.read(path) if e['event'] in ('lp','bounding')))
+
+    def test_poolEventsHaveTraces(self):
+        """Searches in a pool should write their LP and bounding events too, each with the trace of its search"""
+        path=os.path.join(self.dir,'trace.jsonl')
+        with TraceSink(path) as sink:
+            g=LatticeGraph(self.model,[self.x,self.y,self.z],processes=2,sink=sink)
+            try:
+                g.solve(200)
+            finally:
+                g.close()
+        self.assertTrue(g.complete)
+
+        events=list(TraceSink.read(path))
+        searches=set(e['trace'] for e in events if e['event']=='search')
+        lps=[e for e in events if e['event']=='lp']
+        bounding=[e for e in events if e['event']=='bounding']
+        self.assertEqual(len(lps),g.stats['lp'])
+        self.assertEqual(len(bounding),g.stats['real_halfspaces']+g.stats['pseudo_halfspaces'])
+        self.assertTrue(all(e['trace'] in searches for e in lps+bounding))
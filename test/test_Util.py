@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+from fea.util import lstsq, lstsq_many
+
+
+class LstsqManyMatchesLstsq(unittest.TestCase):
+    def setUp(self):
+        rs=np.random.RandomState(0)
+        self.eps=10**-6
+        self.A=rs.rand(6,3)
+        # Consistent right-hand sides alternate with ones far off the column space
+        self.B=np.column_stack([self.A.dot(rs.rand(3)) if j%2==0 else rs.rand(6) for j in range(8)])
+
+    def test_columnsMatch(self):
+        """Each column should match solving it alone, and be marked ok exactly where lstsq accepts it"""
+        for A in (self.A,self.A[:3]):
+            X,ok=lstsq_many(A,self.B[:len(A)],self.eps)
+            self.assertEqual(X.shape,(3,8))
+            for j in range(8):
+                try:
+                    x=lstsq(A,self.B[:len(A),j],self.eps)
+                except ValueError:
+                    self.assertFalse(ok[j])
+                else:
+                    self.assertTrue(ok[j])
+                    self.assertTrue(np.allclose(X[:,j],x))
+        self.assertEqual(list(lstsq_many(self.A,self.B,self.eps)[1]),[True,False]*4)
+
+    def test_singular(self):
+        """A singular square matrix should be refused like it is by lstsq"""
+        A=np.array([[1.,2.],[2.,4.]])
+        self.assertRaises(ValueError,lstsq,A,np.ones(2),self.eps)
+        self.assertRaises(ValueError,lstsq_many,A,np.ones((2,3)),self.eps)